@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Any, Mapping
+import sys
+from functools import lru_cache
+from typing import Any, Mapping, NamedTuple, get_args, get_origin
 
 from agent_framework import ChatAgent, ChatClientProtocol
+from pydantic import BaseModel
 
 from .schemas import (
     CopywritingContent,
@@ -15,9 +16,13 @@ from .schemas import (
     VideoScript,
 )
 
+_AGENT_NAMES = ("strategy_agent", "copywriting_agent", "image_agent", "video_agent")
 
-@dataclass(slots=True)
-class MarketingAgents:
+# Stages (by MarketingAgents field) that may run together; image prompts only need the strategy.
+PARALLEL_STAGE_GROUPS: tuple[tuple[str, ...], ...] = (("strategy",), ("copywriting", "image"), ("video",))
+
+
+class MarketingAgents(NamedTuple):
     """Container for the specialized agents participating in the workflow."""
 
     strategy: ChatAgent
@@ -26,83 +31,76 @@ class MarketingAgents:
     video: ChatAgent
 
 
-def _schema_prompt(model: Any) -> str:
-    """Generate a simplified schema description for LLM prompts."""
-    schema = model.model_json_schema()
-    properties = schema.get("properties", {})
-    definitions = schema.get("$defs", {})
-    
-    def get_type_description(field_info: dict) -> str:
-        """Get human-readable type description."""
-        # Handle $ref (reference to another schema)
-        if "$ref" in field_info:
-            ref_name = field_info["$ref"].split("/")[-1]
-            return f"{ref_name} object"
-        
-        field_type = field_info.get("type", "string")
-        if field_type == "array":
-            items = field_info.get("items", {})
-            if "$ref" in items:
-                ref_name = items["$ref"].split("/")[-1]
-                return f"array of {ref_name} objects"
-            items_type = items.get("type", "string")
-            return f"array of {items_type}s"
-        return field_type
-    
-    # Build a simplified description showing field names, types and descriptions
-    lines = []
-    for field_name, field_info in properties.items():
-        field_type = get_type_description(field_info)
-        description = field_info.get("description", "")
-        lines.append(f"- {field_name} ({field_type}): {description}")
-    
-    result = "Fields:\n" + "\n".join(lines) + "\n"
-    
-    # Add definitions for nested objects
-    if definitions:
-        result += "\nNested object definitions:\n"
-        for def_name, def_schema in definitions.items():
-            def_props = def_schema.get("properties", {})
-            if def_props:
-                result += f"\n{def_name}:\n"
-                for prop_name, prop_info in def_props.items():
-                    prop_type = get_type_description(prop_info)
-                    prop_desc = prop_info.get("description", "")
-                    result += f"  - {prop_name} ({prop_type}): {prop_desc}\n"
-    
-    return result
+# JSON schema names for scalar annotations; anything else (Optional, Union, Any) has
+# no single JSON type and is described as a string.
+_JSON_TYPE_NAMES: dict[Any, str] = {str: "string", int: "integer", float: "number", bool: "boolean"}
 
 
-def create_marketing_agents(
-    chat_client: ChatClientProtocol,
-    *,
-    tool_registry: Mapping[str, list[Any]] | None = None,
-    default_agent_options: Mapping[str, Any] | None = None,
-    per_agent_options: Mapping[str, Mapping[str, Any]] | None = None,
-) -> MarketingAgents:
-    """Instantiate each domain agent with consistent instructions."""
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
 
-    tool_registry = tool_registry or {}
-    default_agent_options = dict(default_agent_options or {})
-    per_agent_options = per_agent_options or {}
-    
-    # Check if image generation tool is available
-    has_image_tool = "image_agent" in tool_registry and len(tool_registry["image_agent"]) > 0
 
-    def _build_agent(name: str, instructions: str) -> ChatAgent:
-        options = {**default_agent_options, **per_agent_options.get(name, {})}
-        return ChatAgent(
-            chat_client=chat_client,
-            name=name,
-            instructions=instructions,
-            tools=tool_registry.get(name),
-            **options,
-        )
+@lru_cache(maxsize=256)
+def _type_description(annotation: Any) -> str:
+    """Get human-readable type description, interned so repeated labels share one string."""
+    if _is_model(annotation):
+        return sys.intern(f"{annotation.__name__} object")
+    if get_origin(annotation) is list:
+        item = (get_args(annotation) or (Any,))[0]
+        if _is_model(item):
+            return sys.intern(f"array of {item.__name__} objects")
+        return sys.intern(f"array of {_JSON_TYPE_NAMES.get(item, 'string')}s")
+    return _JSON_TYPE_NAMES.get(annotation, "string")
+
 
-    # Check if search tool is available
-    has_search_tool = "strategy_agent" in tool_registry and len(tool_registry["strategy_agent"]) > 0
+def _field_lines(model: type[BaseModel], prefix: str) -> list[str]:
+    return [
+        f"{prefix}- {field.alias or name} ({_type_description(field.annotation)}): {field.description or ''}"
+        for name, field in model.model_fields.items()
+    ]
 
-    strategy_instructions = f"""
+
+@lru_cache(maxsize=None)
+def _schema_prompt(model: type[BaseModel]) -> str:
+    """Generate a simplified schema description for LLM prompts.
+
+    Reads ``model_fields`` directly instead of generating the full JSON schema.
+    Results are cached per model class since the schemas never change at runtime.
+    """
+    # Collect every nested model reachable from the fields, like JSON schema $defs
+    nested: dict[str, type[BaseModel]] = {}
+    pending = [field.annotation for field in model.model_fields.values()]
+    while pending:
+        annotation = pending.pop()
+        if _is_model(annotation):
+            if annotation.__name__ not in nested and annotation is not model:
+                nested[annotation.__name__] = annotation
+                pending.extend(field.annotation for field in annotation.model_fields.values())
+        else:
+            pending.extend(get_args(annotation))
+
+    # Build a simplified description showing field names, types and descriptions
+    parts = ["Fields:", *_field_lines(model, ""), ""]
+
+    # Add definitions for nested objects
+    if nested:
+        parts.append("Nested object definitions:")
+        for def_name in sorted(nested):
+            if nested[def_name].model_fields:
+                parts.append(f"\n{def_name}:")
+                parts.extend(_field_lines(nested[def_name], "  "))
+        parts.append("")
+
+    return "\n".join(parts)
+
+
+# Schema prompts for every agent output model, rendered once at import time.
+_SCHEMA_PROMPTS: dict[type, str] = {
+    model: _schema_prompt(model)
+    for model in (MarketingStrategy, CopywritingContent, ImageContent, VideoScript)
+}
+
+_STRATEGY_INSTRUCTIONS = f"""
 You are a senior marketing strategist. Develop data-driven marketing strategies through research and analysis.
 
 ## Workflow
@@ -123,7 +121,7 @@ Consolidate findings into a comprehensive strategy JSON.
 ---
 ## Output Format
 
-{_schema_prompt(MarketingStrategy)}
+{_SCHEMA_PROMPTS[MarketingStrategy]}
 
 Example:
 ```json
@@ -148,14 +146,11 @@ Example:
 - Output: JSON only, no markdown blocks
 """
 
-    # Check if copywriting agent has search tool
-    has_copy_search_tool = "copywriting_agent" in tool_registry and len(tool_registry["copywriting_agent"]) > 0
-
-    copy_instructions = f"""
+_COPY_INSTRUCTIONS = f"""
 You are an expert Content Marketer & Copywriter. Create compelling, high-quality marketing content based on the Strategy Agent's output.
 
 Return CopywritingContent JSON:
-{_schema_prompt(CopywritingContent)}
+{_SCHEMA_PROMPTS[CopywritingContent]}
 
 ---
 ## Use Strategy Agent's Output
@@ -215,8 +210,8 @@ Each social_posts item MUST be an object:
 
 Output only JSON, no Markdown code blocks.
 """
-    if has_copy_search_tool:
-        copy_instructions += """
+
+_COPY_SEARCH_INSTRUCTIONS = """
 **You have the web_search tool available!** You can search the web to get:
 - Trending topics and popular phrases
 - Social media trends and viral copywriting styles
@@ -226,9 +221,9 @@ Output only JSON, no Markdown code blocks.
 Before writing copy, you can search for relevant information to enhance persuasiveness and timeliness.
 """
 
-    image_instructions = f"""
+_IMAGE_INSTRUCTIONS = f"""
 You are an AI image prompt engineer. Using strategy and copywriting keywords, generate ImageContent JSON.
-{_schema_prompt(ImageContent)}
+{_SCHEMA_PROMPTS[ImageContent]}
 
 **Language Note:**
 - scene_description should be written in the `output_language` from Strategy Agent (e.g., Chinese if output_language is "zh")
@@ -241,9 +236,7 @@ You are an AI image prompt engineer. Using strategy and copywriting keywords, ge
 4. prompt MUST be written in English, describing lighting/composition/atmosphere
 """
 
-    # Add tool-specific instructions if image generation tool is available
-    if has_image_tool:
-        image_instructions += """
+_IMAGE_TOOL_INSTRUCTIONS = """
 **You have the generate_image tool! Follow these steps:**
 
 Step 1: Call generate_image tool to generate the first image
@@ -259,22 +252,21 @@ Tool call parameters:
 - prompt_id: Image ID like "prompt-01" (required)
 
 Note: prompt MUST be in English, cannot contain Chinese!
+
+Tip: if the generate_images tool is available, call it once with all prompts (a list of {"prompt": ..., "prompt_id": ...} objects) instead of Steps 1-5; the images are generated in parallel.
 """
-    else:
-        image_instructions += """
+
+_IMAGE_NO_TOOL_INSTRUCTIONS = """
 - assets array left empty (no image generation tool)
 """
 
-    image_instructions += """
+_IMAGE_OUTPUT_INSTRUCTIONS = """
 Final output format is JSON, do not include Markdown code blocks.
 """
 
-    # Check if video generation tool is available
-    has_video_tool = "video_agent" in tool_registry and len(tool_registry["video_agent"]) > 0
-
-    video_instructions = f"""
+_VIDEO_INSTRUCTIONS = f"""
 You are a video script expert, creating three-act marketing short videos. Output VideoScript JSON.
-{_schema_prompt(VideoScript)}
+{_SCHEMA_PROMPTS[VideoScript]}
 
 **Language Note:**
 - voiceover, screen_text, srt_caption, cta should be written in the `output_language` from Strategy Agent
@@ -289,17 +281,15 @@ You are a video script expert, creating three-act marketing short videos. Output
 - srt_caption provides multi-line subtitles in output_language, format "00:00:00,000 --> 00:00:04,000\nSubtitle text"
 """
 
-    if has_video_tool:
-        video_instructions += """
+_VIDEO_TOOL_INSTRUCTIONS = """
 **You have the generate_video tool! Follow these steps:**
 
 Step 1: Design the script structure first (maximum 6 scenes)
-Step 2: Call generate_video tool **one by one** for each scene (in scene_number order, one call at a time)
-Step 3: Wait for current scene generation to complete before generating the next
-Step 4: Collect all results returned by the tool
-Step 5: Output the complete VideoScript JSON
+Step 2: Call generate_video once per scene, issuing the calls for all scenes together (parallel tool calls)
+Step 3: Collect all results returned by the tool and match them to scenes by scene_id
+Step 4: Output the complete VideoScript JSON
 
-⚠️ **Important: API has concurrency limits, you MUST generate videos sequentially one at a time, cannot call multiple generate_video simultaneously!**
+💡 **Parallel calls are safe: the tool itself queues requests beyond the API's concurrency limit, so do not wait for one scene to finish before requesting the next.**
 
 Tool call parameters:
 - prompt: English video description (required) - describe scene, action, camera movement, atmosphere
@@ -339,14 +329,80 @@ Tool call parameters:
 - seconds parameter only supports values 4, 8, 12!
 - Character and product descriptions must be consistent across scenes!
 """
-    else:
-        video_instructions += """
+
+_VIDEO_NO_TOOL_INSTRUCTIONS = """
 - Output only JSON (no video generation tool)
 """
 
+# Fully assembled instructions keyed by (agent name, whether the agent has tools).
+_INSTRUCTIONS: dict[tuple[str, bool], str] = {
+    ("strategy_agent", False): _STRATEGY_INSTRUCTIONS,
+    ("strategy_agent", True): _STRATEGY_INSTRUCTIONS,
+    ("copywriting_agent", False): _COPY_INSTRUCTIONS,
+    ("copywriting_agent", True): "".join((_COPY_INSTRUCTIONS, _COPY_SEARCH_INSTRUCTIONS)),
+    ("image_agent", False): "".join((_IMAGE_INSTRUCTIONS, _IMAGE_NO_TOOL_INSTRUCTIONS, _IMAGE_OUTPUT_INSTRUCTIONS)),
+    ("image_agent", True): "".join((_IMAGE_INSTRUCTIONS, _IMAGE_TOOL_INSTRUCTIONS, _IMAGE_OUTPUT_INSTRUCTIONS)),
+    ("video_agent", False): "".join((_VIDEO_INSTRUCTIONS, _VIDEO_NO_TOOL_INSTRUCTIONS)),
+    ("video_agent", True): "".join((_VIDEO_INSTRUCTIONS, _VIDEO_TOOL_INSTRUCTIONS)),
+}
+
+
+def select_instructions(tool_registry: Mapping[str, list[Any]] | None = None) -> dict[str, str]:
+    """Return the instruction variant each agent uses for the given tool registry."""
+
+    tool_registry = tool_registry or {}
+    return {name: _INSTRUCTIONS[(name, bool(tool_registry.get(name)))] for name in _AGENT_NAMES}
+
+
+def create_marketing_agents(
+    chat_client: ChatClientProtocol,
+    *,
+    tool_registry: Mapping[str, list[Any]] | None = None,
+    default_agent_options: Mapping[str, Any] | None = None,
+    per_agent_options: Mapping[str, Mapping[str, Any]] | None = None,
+    prompt_cache_key: str | None = None,
+) -> MarketingAgents:
+    """Instantiate each domain agent with consistent instructions.
+
+    The instructions are static, so they always form the same leading bytes of each
+    request and benefit from the provider's automatic prefix caching. When
+    ``prompt_cache_key`` is set, it is forwarded per agent (``<key>:<agent name>``)
+    so requests sharing a system prompt are routed to the same cache.
+    """
+
+    tool_registry = tool_registry or {}
+    default_agent_options = default_agent_options or {}
+    per_agent_options = per_agent_options or {}
+
+    # Resolve instructions and options once per agent; agents without overrides
+    # use the default options as-is instead of each getting a merged copy
+    instructions = select_instructions(tool_registry)
+    agent_options: dict[str, Mapping[str, Any]] = {}
+    for name in _AGENT_NAMES:
+        if name not in per_agent_options and not prompt_cache_key:
+            agent_options[name] = default_agent_options
+            continue
+        options = {**default_agent_options, **per_agent_options.get(name, {})}
+        if prompt_cache_key:
+            options["additional_chat_options"] = {
+                "prompt_cache_key": f"{prompt_cache_key}:{name}",
+                **(options.get("additional_chat_options") or {}),
+            }
+        agent_options[name] = options
+
+    def _build_agent(name: str) -> ChatAgent:
+        return ChatAgent(
+            chat_client=chat_client,
+            name=name,
+            instructions=instructions[name],
+            tools=tool_registry.get(name),
+            **agent_options[name],
+        )
+
     return MarketingAgents(
-        strategy=_build_agent("strategy_agent", strategy_instructions),
-        copywriting=_build_agent("copywriting_agent", copy_instructions),
-        image=_build_agent("image_agent", image_instructions),
-        video=_build_agent("video_agent", video_instructions),
+        strategy=_build_agent("strategy_agent"),
+        copywriting=_build_agent("copywriting_agent"),
+        image=_build_agent("image_agent"),
+        video=_build_agent("video_agent"),
     )
+
@@ -5,81 +5,134 @@ from __future__ import annotations
 import argparse
 import asyncio
 import os
-from typing import Any
+import sys
+from functools import lru_cache
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 
-load_dotenv()  # Load environment variables from .env file
-
 from agent_framework.openai import OpenAIChatClient
-
-try:  # Optional import; azure support is nice to have but not required.
-    from agent_framework.azure import AzureOpenAIChatClient
-except Exception:  # pragma: no cover - azure client not installed
-    AzureOpenAIChatClient = None  # type: ignore
+from pydantic import BaseModel
 
 from .workflow import AgenticMarketingWorkflow, MarketingWorkflowConfig
 
 
+# Client keyword -> (CLI dest, environment fallback, default) for each provider.
+_CLIENT_SETTINGS: dict[str, dict[str, tuple[str, str, Optional[str]]]] = {
+    "azure": {
+        "endpoint": ("azure_endpoint", "AZURE_OPENAI_ENDPOINT", None),
+        "deployment_name": ("azure_deployment", "AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", None),
+        "api_key": ("azure_api_key", "AZURE_OPENAI_API_KEY", None),
+        "api_version": ("azure_api_version", "AZURE_OPENAI_API_VERSION", None),
+    },
+    "openai": {
+        "model_id": ("model_id", "OPENAI_CHAT_MODEL_ID", "gpt-4o-mini"),
+        "api_key": ("api_key", "OPENAI_API_KEY", None),
+        "base_url": ("base_url", "OPENAI_BASE_URL", None),
+    },
+}
+
+
 def _build_chat_client(args: argparse.Namespace) -> Any:
-    if args.provider == "azure":
-        if AzureOpenAIChatClient is None:
-            raise RuntimeError("agent_framework.azure is not available; install azure extras to use this provider")
-        return AzureOpenAIChatClient(
-            endpoint=args.azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT"),
-            deployment_name=args.azure_deployment or os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
-            api_key=args.azure_api_key or os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=args.azure_api_version or os.getenv("AZURE_OPENAI_API_VERSION"),
-        )
-
-    return OpenAIChatClient(
-        model_id=args.model_id or os.getenv("OPENAI_CHAT_MODEL_ID", "gpt-4o-mini"),
-        api_key=args.api_key or os.getenv("OPENAI_API_KEY"),
-        base_url=args.base_url or os.getenv("OPENAI_BASE_URL"),
-    )
+    # Connection flags default to SUPPRESS, so unset flags are simply absent from args
+    settings = {
+        keyword: getattr(args, dest, None) or os.getenv(env_var, default)
+        for keyword, (dest, env_var, default) in _CLIENT_SETTINGS[args.provider].items()
+    }
+    return _create_chat_client(args.provider, **settings)
+
+
+@lru_cache(maxsize=None)
+def _create_chat_client(provider: str, **settings: Optional[str]) -> Any:
+    """Create the chat client once per distinct settings.
+
+    All agents share the returned client, so its pooled HTTP connections stay
+    alive across agent calls and across workflow runs in the same process.
+    """
+    if provider == "azure":
+        # Optional import; only pay for the azure client when it is actually used.
+        try:
+            from agent_framework.azure import AzureOpenAIChatClient
+        except Exception as exc:  # pragma: no cover - azure client not installed
+            raise RuntimeError("agent_framework.azure is not available; install azure extras to use this provider") from exc
+        return AzureOpenAIChatClient(**settings)
+
+    return OpenAIChatClient(**settings)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run the Agentic Marketing Content Workflow")
     parser.add_argument("topic", help="Campaign topic or brief")
     parser.add_argument("--provider", choices=["openai", "azure"], default="azure")
-    parser.add_argument("--model-id", dest="model_id", help="OpenAI model ID")
-    parser.add_argument("--api-key", dest="api_key", help="OpenAI API key")
-    parser.add_argument("--base-url", dest="base_url", help="Custom OpenAI endpoint")
-    parser.add_argument("--azure-endpoint", dest="azure_endpoint")
-    parser.add_argument("--azure-deployment", dest="azure_deployment")
-    parser.add_argument("--azure-api-key", dest="azure_api_key")
-    parser.add_argument("--azure-api-version", dest="azure_api_version")
+    parser.add_argument("--model-id", dest="model_id", default=argparse.SUPPRESS, help="OpenAI model ID")
+    parser.add_argument("--api-key", dest="api_key", default=argparse.SUPPRESS, help="OpenAI API key")
+    parser.add_argument("--base-url", dest="base_url", default=argparse.SUPPRESS, help="Custom OpenAI endpoint")
+    parser.add_argument("--azure-endpoint", dest="azure_endpoint", default=argparse.SUPPRESS)
+    parser.add_argument("--azure-deployment", dest="azure_deployment", default=argparse.SUPPRESS)
+    parser.add_argument("--azure-api-key", dest="azure_api_key", default=argparse.SUPPRESS)
+    parser.add_argument("--azure-api-version", dest="azure_api_version", default=argparse.SUPPRESS)
     parser.add_argument("--output-dir", dest="output_dir", default="artifacts/campaigns")
     parser.add_argument("--no-persist", dest="persist", action="store_false", help="Skip writing files to disk")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Ignore cached campaigns and always run every agent")
     parser.add_argument("--enable-image-gen", dest="enable_image_gen", action="store_true", 
                         help="Enable AI image generation using Azure FLUX model")
     parser.add_argument("--enable-video-gen", dest="enable_video_gen", action="store_true",
                         help="Enable AI video generation using Azure Sora-2 model")
     parser.add_argument("--deep-research", dest="deep_research", action="store_true",
                         help="Enable deep research mode with multi-agent planning and execution")
+    parser.add_argument("--parallel", dest="parallel_stages", action="store_true",
+                        help="Run the copywriting and image agents concurrently (image prompts use the strategy only)")
     parser.add_argument("--debug", action="store_true",
                         help="Enable debug output showing agent execution details")
+    parser.add_argument("--stream", action="store_true",
+                        help="Emit each stage's JSON as a line as soon as it completes")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Pretty-print the resulting JSON (compact by default)")
+    parser.add_argument("--prompt-cache-key", dest="prompt_cache_key",
+                        help="Provider prompt cache key so repeated runs reuse cached system prompts")
     return parser.parse_args()
 
 
+def _write_json(model: BaseModel, *, indent: Optional[int] = None) -> None:
+    """Serialize ``model`` straight to UTF-8 bytes and write them to stdout."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(model.__pydantic_serializer__.to_json(model, indent=indent))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
+
+
+async def _stream_results(workflow: AgenticMarketingWorkflow, topic: str) -> None:
+    """Write each stage result as a JSON line as soon as the workflow yields it."""
+    async for partial in workflow.stream(topic):
+        _write_json(partial)
+
+
 def main() -> None:
     args = parse_args()
+    load_dotenv()  # Load environment variables from .env file
     client = _build_chat_client(args)
     workflow = AgenticMarketingWorkflow(
         client,
         config=MarketingWorkflowConfig(
             persist_output=args.persist, 
+            use_response_cache=args.use_cache,
             output_dir=args.output_dir,
             enable_image_generation=args.enable_image_gen,
             enable_video_generation=args.enable_video_gen,
             enable_deep_research=args.deep_research,
+            enable_parallel_stages=args.parallel_stages,
             debug=args.debug,
+            prompt_cache_key=args.prompt_cache_key,
         ),
     )
 
+    if args.stream:
+        asyncio.run(_stream_results(workflow, args.topic))
+        return
+
     result = asyncio.run(workflow.run(args.topic))
-    print(result.model_dump_json(indent=2, ensure_ascii=False))
+    _write_json(result, indent=2 if args.pretty else None)
 
 
 if __name__ == "__main__":
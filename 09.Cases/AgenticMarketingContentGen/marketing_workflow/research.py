@@ -1,38 +1,57 @@
 """Deep Research Executor using Magentic One pattern for comprehensive market research."""
 
 import asyncio
-import json
+import hashlib
+import re
 import sys
-from typing import Any, Mapping, Optional
+from collections import OrderedDict
+from contextlib import aclosing
+from functools import cached_property
+from typing import Any, Callable, Mapping, Optional
+from weakref import WeakKeyDictionary
 
 from agent_framework import (
+    AgentRunResponseUpdate,
+    AgentRunUpdateEvent,
     ChatAgent,
     ChatClientProtocol,
     ChatMessage,
     Executor,
-    MagenticBuilder,
     Role,
+    TextContent,
     WorkflowContext,
     handler,
-    ai_function,
 )
-from typing import Annotated
 
 from .schemas import MarketingStrategy
-from .utils import extract_json_object
+from .utils import JsonObjectScanner, client_identity, compact_json, format_json, parse_json_object
 
 
-def create_research_agents(
-    chat_client: ChatClientProtocol,
-    search_tool: Any,
-) -> dict[str, ChatAgent]:
-    """Create specialized research agents for deep research workflow."""
-    
-    # Planner Agent: Analyzes topic and creates research plan
-    planner = ChatAgent(
-        chat_client=chat_client,
-        name="research_planner",
-        instructions="""You are a research planning expert. Analyze the marketing topic provided by the user and develop a comprehensive research plan.
+# Research plans (and their compact prompt JSON) keyed by a digest of the planner's client and the topic,
+# shared across executors in this process
+_PLAN_CACHE: OrderedDict[str, tuple[dict[str, Any], str]] = OrderedDict()
+_PLAN_CACHE_SIZE = 256
+
+def _scope_queries(scope: Any) -> list[str]:
+    """Return a plan scope's search queries, or [] unless it is a mapping with a list of strings.
+
+    Planner output is LLM-generated; scopes without usable queries go to the
+    tool-calling researcher instead of being pre-fetched.
+    """
+    if not isinstance(scope, Mapping):
+        return []
+    queries = scope.get("search_queries")
+    if not isinstance(queries, (list, tuple)) or not all(isinstance(query, str) for query in queries):
+        return []
+    return [query for query in queries if query]
+
+
+# One group per script: Chinese ideographs, Japanese kana, Korean hangul
+_CJK_SCRIPT_RE = re.compile(r"([\u4e00-\u9fff])|([\u3040-\u30ff])|([\uac00-\ud7af])")
+_CJK_SCRIPT_LANGUAGES = {1: "zh", 2: "ja", 3: "ko"}
+
+
+_PLANNER_INSTRUCTIONS = """You are a research planning expert. Analyze the marketing topic provided by the user and develop a comprehensive research plan.
 
 **Task**: Create a deep research plan for the given topic, output in JSON format.
 
@@ -59,24 +78,10 @@ def create_research_agents(
 ```
 
 Output only JSON, do not include other content.
-""",
-    )
-    
-    # Researcher Agent: Executes searches and gathers information
-    researcher = ChatAgent(
-        chat_client=chat_client,
-        name="researcher",
-        instructions="""You are a market researcher. Execute searches and collect information based on the research plan.
-
-**Task**: Use the web_search tool to execute search queries from the research plan and summarize findings.
+"""
 
-**Workflow**:
-1. Execute search queries in priority order
-2. Use search_depth="advanced" for each search to get more comprehensive results
-3. Extract key information: data, trends, case studies, pain points, opportunities
-4. Record information sources
 
-**Output format**:
+_RESEARCH_FINDINGS_FORMAT = """**Output format**:
 ```json
 {
   "research_findings": [
@@ -94,16 +99,50 @@ Output only JSON, do not include other content.
 }
 ```
 
-⚠️ Important: You MUST actually call the web_search tool to get real data, do not fabricate information!
-""",
-        tools=[search_tool],
-    )
-    
-    # Analyst Agent: Synthesizes research into marketing strategy
-    analyst = ChatAgent(
-        chat_client=chat_client,
-        name="research_analyst",
-        instructions="""You are a marketing strategy analyst. Synthesize research findings to generate a structured marketing strategy.
+"""
+
+_RESEARCHER_INSTRUCTIONS = f"""You are a market researcher. Execute searches and collect information based on the research plan.
+
+**Task**: Use the web_search tool to execute search queries from the research plan and summarize findings.
+
+**Workflow**:
+1. Execute search queries in priority order
+2. Use search_depth="advanced" for each search to get more comprehensive results
+3. Extract key information: data, trends, case studies, pain points, opportunities
+4. Record information sources
+
+{_RESEARCH_FINDINGS_FORMAT}⚠️ Important: You MUST actually call the web_search tool to get real data, do not fabricate information!
+"""
+
+# Researcher variant that also has the batched search tool
+_BATCH_RESEARCHER_INSTRUCTIONS = f"""You are a market researcher. Execute searches and collect information based on the research plan.
+
+**Task**: Use the web_search_many and web_search tools to execute search queries from the research plan and summarize findings.
+
+**Workflow**:
+1. Execute search queries in priority order. Whenever you have 2 or more queries, send them in one web_search_many call instead of calling web_search repeatedly; use web_search for a single follow-up query
+2. Use search_depth="advanced" for each search to get more comprehensive results
+3. Extract key information: data, trends, case studies, pain points, opportunities
+4. Record information sources
+
+{_RESEARCH_FINDINGS_FORMAT}⚠️ Important: You MUST actually call the search tools to get real data, do not fabricate information!
+"""
+
+# Researcher variant for pre-fetched search results; it has no tools, so it must not be told to search
+_EVIDENCE_RESEARCHER_INSTRUCTIONS = f"""You are a market researcher. Summarize pre-fetched web search results based on the research plan.
+
+**Task**: The search queries from the research plan have already been executed and their results are included in the request. Summarize the findings.
+
+**Workflow**:
+1. Review results in priority order
+2. Extract key information: data, trends, case studies, pain points, opportunities
+3. Record information sources
+
+{_RESEARCH_FINDINGS_FORMAT}⚠️ Important: Only use information from the provided search results, do not fabricate information!
+"""
+
+
+_ANALYST_INSTRUCTIONS = """You are a marketing strategy analyst. Synthesize research findings to generate a structured marketing strategy.
 
 **CRITICAL: Language Detection & Consistency**
 First, detect the language of the original user topic. Set `output_language` field accordingly:
@@ -142,13 +181,67 @@ First, detect the language of the original user topic. Set `output_language` fie
 ⚠️ Ensure each field has at least 3 entries!
 ⚠️ All text must be in the output_language!
 Output only JSON, do not include Markdown code blocks.
-""",
+"""
+
+
+def _create_planner(chat_client: ChatClientProtocol) -> ChatAgent:
+    """Planner Agent: Analyzes topic and creates research plan."""
+    return ChatAgent(
+        chat_client=chat_client,
+        name="research_planner",
+        instructions=_PLANNER_INSTRUCTIONS,
     )
-    
+
+
+def _create_researcher(
+    chat_client: ChatClientProtocol,
+    search_tool: Any,
+    search_many_tool: Any = None,
+) -> ChatAgent:
+    """Researcher Agent: Executes searches and gathers information."""
+    if search_many_tool is None:
+        return ChatAgent(
+            chat_client=chat_client,
+            name="researcher",
+            instructions=_RESEARCHER_INSTRUCTIONS,
+            tools=[search_tool],
+        )
+    return ChatAgent(
+        chat_client=chat_client,
+        name="researcher",
+        instructions=_BATCH_RESEARCHER_INSTRUCTIONS,
+        tools=[search_many_tool, search_tool],
+    )
+
+
+def _create_evidence_researcher(chat_client: ChatClientProtocol) -> ChatAgent:
+    """Researcher Agent without tools: Summarizes search results fetched up front."""
+    return ChatAgent(
+        chat_client=chat_client,
+        name="researcher",
+        instructions=_EVIDENCE_RESEARCHER_INSTRUCTIONS,
+    )
+
+
+def _create_analyst(chat_client: ChatClientProtocol) -> ChatAgent:
+    """Analyst Agent: Synthesizes research into marketing strategy."""
+    return ChatAgent(
+        chat_client=chat_client,
+        name="research_analyst",
+        instructions=_ANALYST_INSTRUCTIONS,
+    )
+
+
+def create_research_agents(
+    chat_client: ChatClientProtocol,
+    search_tool: Any,
+    search_many_tool: Any = None,
+) -> dict[str, ChatAgent]:
+    """Create specialized research agents for deep research workflow."""
     return {
-        "planner": planner,
-        "researcher": researcher,
-        "analyst": analyst,
+        "planner": _create_planner(chat_client),
+        "researcher": _create_researcher(chat_client, search_tool, search_many_tool),
+        "analyst": _create_analyst(chat_client),
     }
 
 
@@ -171,16 +264,55 @@ class DeepResearchExecutor(Executor):
         *,
         debug: bool = False,
         max_rounds: int = 10,
+        max_concurrency: int = 8,
+        fuse_planning: bool = False,
+        search_fn: Optional[Callable[..., dict[str, Any]]] = None,
+        search_many_tool: Any = None,
     ) -> None:
         super().__init__(id="deep-research-executor")
         self._chat_client = chat_client
         self._search_tool = search_tool
+        # Optional batched search tool; the researcher is told to prefer it for 2+ queries
+        self._search_many_tool = search_many_tool
         self._debug = debug
         self._max_rounds = max_rounds
+        # Caps in-flight research agent calls so fan-out stays under provider rate limits; one
+        # semaphore per event loop, since each asyncio.run() (run_sync, the CLI) starts a new loop
+        self._max_concurrency = max_concurrency
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+        # Let the researcher plan its own searches, saving the planner round trip
+        self._fuse_planning = fuse_planning
+        # Plans are only reused for the same planner model; fused runs never consult the plan cache
+        self._plan_key_prefix = compact_json(client_identity(chat_client))
+        # Plain (non-tool) search callable; when set, plan queries are fetched up front and deduplicated
+        self._search_fn = search_fn
         self._author = "strategy_agent"  # Use same author name for compatibility
-        
-        # Create research agents
-        self._research_agents = create_research_agents(chat_client, search_tool)
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency limit for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    # Research agents are built on first use, so e.g. a cached plan never constructs the planner
+    @cached_property
+    def _planner(self) -> ChatAgent:
+        return _create_planner(self._chat_client)
+
+    @cached_property
+    def _researcher(self) -> ChatAgent:
+        return _create_researcher(self._chat_client, self._search_tool, self._search_many_tool)
+
+    @cached_property
+    def _evidence_researcher(self) -> ChatAgent:
+        return _create_evidence_researcher(self._chat_client)
+
+    @cached_property
+    def _analyst(self) -> ChatAgent:
+        return _create_analyst(self._chat_client)
 
     def _debug_print(self, message: str) -> None:
         """Print debug message to stderr."""
@@ -199,29 +331,29 @@ class DeepResearchExecutor(Executor):
         topic = self._extract_topic(conversation)
         self._debug_print(f"🔬 Deep Research Started for: {topic}")
         
-        # Phase 1: Research Planning
-        self._debug_print("📋 Phase 1: Research Planning")
-        research_plan = await self._run_planning(topic)
-        self._debug_print(f"   Plan created with {len(research_plan.get('research_dimensions', []))} dimensions")
-        
-        # Phase 2: Execute Research
-        self._debug_print("🔍 Phase 2: Executing Research")
-        research_findings = await self._run_research(topic, research_plan)
+        if self._fuse_planning:
+            # Phases 1+2: a single researcher call plans and executes the searches
+            self._debug_print("🔍 Phases 1+2: Planning and Executing Research")
+            plan_json = None
+            research_findings = await self._run_fused_research(topic)
+        else:
+            # Phase 1: Research Planning
+            self._debug_print("📋 Phase 1: Research Planning")
+            research_plan, plan_json = await self._run_planning(topic)
+            self._debug_print(f"   Plan created with {len(research_plan.get('research_dimensions', []))} dimensions")
+            
+            # Phase 2: Execute Research
+            self._debug_print("🔍 Phase 2: Executing Research")
+            research_findings = await self._run_research(topic, research_plan, plan_json)
         self._debug_print(f"   Gathered findings from {len(research_findings.get('research_findings', []))} dimensions")
         
         # Phase 3: Synthesize Strategy
         self._debug_print("📊 Phase 3: Synthesizing Strategy")
-        strategy_json = await self._run_analysis(topic, research_plan, research_findings)
+        strategy_json = await self._run_analysis(topic, plan_json, research_findings)
         self._debug_print("   Strategy synthesized")
         
-        # Validate the strategy
-        try:
-            strategy = MarketingStrategy.model_validate(strategy_json)
-            output_text = strategy.model_dump_json(indent=2, ensure_ascii=False)
-        except Exception as e:
-            self._debug_print(f"⚠️ Strategy validation warning: {e}")
-            # Fallback: output raw JSON
-            output_text = json.dumps(strategy_json, ensure_ascii=False, indent=2)
+        # Forward the analyst JSON as-is; downstream consumers validate against their own schemas
+        output_text = format_json(strategy_json)
         
         # Create output message with same author as strategy_agent
         strategy_message = ChatMessage(
@@ -230,29 +362,90 @@ class DeepResearchExecutor(Executor):
             text=output_text,
         )
         
-        # Send updated conversation downstream
-        updated_conversation = list(conversation)
-        updated_conversation.append(strategy_message)
-        await ctx.send_message(updated_conversation)
+        # Surface the strategy like a streaming agent so run_stream consumers can observe it
+        await ctx.add_event(
+            AgentRunUpdateEvent(
+                self.id,
+                AgentRunResponseUpdate(
+                    contents=[TextContent(text=output_text)],
+                    role=Role.ASSISTANT,
+                    author_name=self._author,
+                ),
+            )
+        )
+        
+        # Send updated conversation downstream (a new list; the incoming one may be shared)
+        await ctx.send_message([*conversation, strategy_message])
+        
+        # Validation is diagnostic only, so it runs after the strategy is already downstream
+        if self._debug:
+            try:
+                MarketingStrategy.model_validate(strategy_json)
+            except Exception as e:
+                self._debug_print(f"⚠️ Strategy validation warning: {e}")
         
         self._debug_print("✅ Deep Research Completed")
 
-    async def _run_planning(self, topic: str) -> dict[str, Any]:
-        """Run the planner agent to create research plan."""
-        planner = self._research_agents["planner"]
+    async def _run_agent(self, agent: ChatAgent, prompt: str) -> str:
+        """Stream ``agent``'s reply and return it as soon as a parseable JSON object is complete.
+
+        The call waits for a free slot under the shared concurrency limit. Once the
+        outer JSON object closes, the remaining tokens are not awaited, so the next
+        phase can start without paying for the tail of the generation.
+        """
+        scanner = JsonObjectScanner()
+        chunks: list[str] = []
+        scanned_to = 0  # Offset in the streamed text where the current scanner started
+        async with self._semaphore:
+            async with aclosing(agent.run_stream(prompt)) as updates:
+                async for update in updates:
+                    if not update.text:
+                        continue
+                    chunks.append(update.text)
+                    json_text = scanner.feed(update.text)
+                    while json_text is not None:
+                        try:
+                            parse_json_object(json_text)
+                            return json_text
+                        except ValueError:
+                            pass
+                        # Balanced prose braces such as "{topic}"; rescan the text that followed them
+                        streamed = "".join(chunks)
+                        scanned_to = streamed.index(json_text, scanned_to) + len(json_text)
+                        scanner = JsonObjectScanner()
+                        json_text = scanner.feed(streamed[scanned_to:])
+        return "".join(chunks)
+
+    async def _run_planning(self, topic: str) -> tuple[dict[str, Any], str]:
+        """Run the planner agent to create research plan.
+
+        Returns the plan along with its compact prompt JSON so later phases
+        embed it without serializing the plan again.
+        """
+        planner = self._planner
+        key = hashlib.blake2b(f"{self._plan_key_prefix}\n{topic}".encode("utf-8"), digest_size=16).hexdigest()
+        cached = _PLAN_CACHE.get(key)
+        if cached is not None:
+            _PLAN_CACHE.move_to_end(key)
+            self._debug_print("   Reusing cached research plan")
+            return cached
         
         prompt = f"Please create a deep research plan for the following marketing topic:\n\n{topic}"
         
-        response = await planner.run(prompt)
+        plan_text = await self._run_agent(planner, prompt)
         
         try:
-            plan_text = response.text or ""
-            plan_json = extract_json_object(plan_text)
-            return json.loads(plan_json)
+            plan = parse_json_object(plan_text)
+            result = (plan, compact_json(plan))
+            # Only cache real planner output, never the fallback plan below
+            _PLAN_CACHE[key] = result
+            if len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+                _PLAN_CACHE.popitem(last=False)
+            return result
         except Exception as e:
             self._debug_print(f"⚠️ Planning parse error: {e}")
             # Return a basic plan
-            return {
+            plan = {
                 "topic_analysis": topic,
                 "research_dimensions": [
                     {"dimension": "Market Trends", "priority": "high", "search_queries": [f"{topic} market trends 2024 2025", f"{topic} industry outlook"], "info_needed": ["Market size", "Growth trends"]},
@@ -261,57 +454,160 @@ class DeepResearchExecutor(Executor):
                 ],
                 "target_insights": ["Market opportunities", "User pain points", "Differentiated positioning"]
             }
+            return plan, compact_json(plan)
+
+    async def _run_research(self, topic: str, plan: dict[str, Any], plan_json: str) -> dict[str, Any]:
+        """Run the researcher agent once per research dimension, concurrently."""
+        # Fall back to researching the whole plan at once when it has no dimensions
+        dimensions = plan.get("research_dimensions")
+        if not isinstance(dimensions, (list, tuple)):
+            dimensions = None
+        if dimensions:
+            scopes = [(dimension, compact_json(dimension)) for dimension in dimensions]
+        else:
+            scopes = [(plan, plan_json)]
+
+        search_results = await self._prefetch_searches(dimensions or [])
+        replies = await asyncio.gather(
+            *(self._research_scope(topic, scope, scope_json, search_results) for scope, scope_json in scopes),
+            return_exceptions=True,
+        )
 
-    async def _run_research(self, topic: str, plan: dict[str, Any]) -> dict[str, Any]:
-        """Run the researcher agent to execute searches."""
-        researcher = self._research_agents["researcher"]
-        
-        # Build research prompt with plan
-        prompt = f"""Please execute searches and collect information based on the following research plan.
+        # Parse each dimension separately so one failed call or bad JSON only drops that dimension
+        findings: list[dict[str, Any]] = []
+        for (scope, _), reply in zip(scopes, replies):
+            try:
+                if isinstance(reply, BaseException):
+                    raise reply
+                findings.append(parse_json_object(reply))
+            except Exception as e:
+                label = scope.get("dimension", topic) if isinstance(scope, Mapping) else topic
+                self._debug_print(f"⚠️ Research parse error ({label}): {e}")
+
+        return self._merge_findings(topic, findings)
+
+    async def _prefetch_searches(self, dimensions: list[Any]) -> dict[str, dict[str, Any]]:
+        """Run every distinct plan query once, concurrently, and map each query to its results."""
+        if self._search_fn is None:
+            return {}
+        # Planners often repeat queries across dimensions; dict.fromkeys dedupes while keeping plan order
+        queries = list(dict.fromkeys(
+            query for dimension in dimensions for query in _scope_queries(dimension)
+        ))
+
+        async def search(query: str) -> dict[str, Any]:
+            async with self._semaphore:
+                return await asyncio.to_thread(self._search_fn, query, search_depth="advanced")
+
+        results = await asyncio.gather(*(search(query) for query in queries), return_exceptions=True)
+        self._debug_print(f"   Pre-fetched {len(queries)} distinct search queries")
+        # Scopes with a failed query fall back to the tool-calling researcher; the search tools report
+        # failures (missing key, rate limit, timeout) as an "error" entry rather than raising
+        return {
+            query: result
+            for query, result in zip(queries, results)
+            if not isinstance(result, BaseException) and not result.get("error")
+        }
+
+    async def _research_scope(
+        self,
+        topic: str,
+        scope: Any,
+        scope_json: str,
+        search_results: Mapping[str, dict[str, Any]],
+    ) -> str:
+        """Research one scope, from pre-fetched results when all of its queries were fetched."""
+        queries = _scope_queries(scope)
+        if not queries or any(query not in search_results for query in queries):
+            return await self._run_agent(self._researcher, self._research_prompt(topic, scope_json))
+
+        prompt = f"""Please summarize findings based on the following research plan and its pre-fetched search results.
 
 **Topic**: {topic}
 
 **Research Plan**:
-{json.dumps(plan, ensure_ascii=False, indent=2)}
+{scope_json}
 
-Please use the web_search tool to execute search queries for each dimension and summarize findings.
-Prioritize high priority dimensions first.
+**Search Results**:
+{compact_json({query: search_results[query] for query in queries})}
 """
-        
-        response = await researcher.run(prompt)
-        
+        return await self._run_agent(self._evidence_researcher, prompt)
+
+    async def _run_fused_research(self, topic: str) -> dict[str, Any]:
+        """Run the researcher agent once, letting it plan its own research dimensions."""
+        prompt = f"""Please plan and execute research for the following marketing topic in a single pass.
+
+**Topic**: {topic}
+
+First decompose the topic into 3-5 research dimensions, each with search queries in English and in the user's language.
+Then use the web_search tool to execute those queries, high priority dimensions first, and summarize findings per dimension.
+"""
+        reply = await self._run_agent(self._researcher, prompt)
+
         try:
-            findings_text = response.text or ""
-            findings_json = extract_json_object(findings_text)
-            return json.loads(findings_json)
+            findings = [parse_json_object(reply)]
         except Exception as e:
             self._debug_print(f"⚠️ Research parse error: {e}")
-            # Return basic findings structure
-            return {
-                "research_findings": [],
-                "market_overview": f"Research on {topic}",
-                "competitive_landscape": "To be analyzed",
-                "opportunity_areas": []
-            }
+            findings = []
+        return self._merge_findings(topic, findings)
+
+    @staticmethod
+    def _research_prompt(topic: str, scope_json: str) -> str:
+        """Build the researcher prompt for a single dimension (or the whole plan)."""
+        return f"""Please execute searches and collect information based on the following research plan.
+
+**Topic**: {topic}
+
+**Research Plan**:
+{scope_json}
+
+Please use the web_search tool to execute search queries for each dimension and summarize findings.
+Prioritize high priority dimensions first.
+"""
+
+    @staticmethod
+    def _merge_findings(topic: str, findings: list[dict[str, Any]]) -> dict[str, Any]:
+        """Combine per-dimension researcher outputs into a single findings structure."""
+        merged: dict[str, Any] = {
+            "research_findings": [],
+            "market_overview": f"Research on {topic}",
+            "competitive_landscape": "To be analyzed",
+            "opportunity_areas": [],
+        }
+        overviews: list[str] = []
+        landscapes: list[str] = []
+        for item in findings:
+            merged["research_findings"].extend(item.get("research_findings") or [])
+            for area in item.get("opportunity_areas") or []:
+                if area not in merged["opportunity_areas"]:
+                    merged["opportunity_areas"].append(area)
+            if item.get("market_overview"):
+                overviews.append(item["market_overview"])
+            if item.get("competitive_landscape"):
+                landscapes.append(item["competitive_landscape"])
+        if overviews:
+            merged["market_overview"] = "\n\n".join(overviews)
+        if landscapes:
+            merged["competitive_landscape"] = "\n\n".join(landscapes)
+        return merged
 
     async def _run_analysis(
         self, 
         topic: str, 
-        plan: dict[str, Any], 
+        plan_json: Optional[str], 
         findings: dict[str, Any]
     ) -> dict[str, Any]:
         """Run the analyst agent to synthesize strategy."""
-        analyst = self._research_agents["analyst"]
+        analyst = self._analyst
+        # Fused research has no separate plan; the findings carry their own dimensions
+        plan_section = f"**Research Plan**:\n{plan_json}\n\n" if plan_json is not None else ""
         
         prompt = f"""Please generate a structured marketing strategy based on the following research data.
 
 **Topic**: {topic}
 
-**Research Plan**:
-{json.dumps(plan, ensure_ascii=False, indent=2)}
-
-**Research Findings**:
-{json.dumps(findings, ensure_ascii=False, indent=2)}
+{plan_section}**Research Findings**:
+{compact_json(findings)}
 
 Please generate MarketingStrategy JSON, ensuring:
 1. The topic field contains the original topic
@@ -319,12 +615,10 @@ Please generate MarketingStrategy JSON, ensuring:
 3. Content is based on research findings, do not fabricate
 """
         
-        response = await analyst.run(prompt)
+        strategy_text = await self._run_agent(analyst, prompt)
         
         try:
-            strategy_text = response.text or ""
-            strategy_json = extract_json_object(strategy_text)
-            result = json.loads(strategy_json)
+            result = parse_json_object(strategy_text)
             # Ensure topic is set
             if "topic" not in result:
                 result["topic"] = topic
@@ -350,20 +644,20 @@ Please generate MarketingStrategy JSON, ensuring:
     @staticmethod
     def _detect_language(text: str) -> str:
         """Simple language detection based on character ranges."""
-        # Check for CJK characters
-        for char in text:
-            if '\u4e00' <= char <= '\u9fff':
-                return "zh"  # Chinese
-            if '\u3040' <= char <= '\u309f' or '\u30a0' <= char <= '\u30ff':
-                return "ja"  # Japanese
-            if '\uac00' <= char <= '\ud7af':
-                return "ko"  # Korean
-        return "en"  # Default to English
+        # The first CJK character in the text decides, as with a left-to-right scan
+        match = _CJK_SCRIPT_RE.search(text)
+        if match is None:
+            return "en"  # Default to English
+        return _CJK_SCRIPT_LANGUAGES[match.lastindex]
 
     @staticmethod
     def _extract_topic(conversation: list[ChatMessage]) -> str:
         """Extract the user topic from conversation."""
-        for message in conversation:
-            if message.role == Role.USER and message.text:
-                return message.text.strip()
-        raise ValueError("User topic not found in conversation history.")
+        # ChatMessage.text joins the message contents on every access, so read it once per message
+        topic = next(
+            (text.strip() for message in conversation if message.role == Role.USER and (text := message.text)),
+            None,
+        )
+        if topic is None:
+            raise ValueError("User topic not found in conversation history.")
+        return topic
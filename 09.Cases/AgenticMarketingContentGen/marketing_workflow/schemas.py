@@ -2,12 +2,37 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, List, Optional, Union
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, ClassVar, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
+_HASHTAG_SEPARATORS = str.maketrans({",": " ", ";": " "})
+
+# (target field, alternative fields in priority order) pairs applied after validation
+_Fallbacks = tuple[tuple[str, tuple[str, ...]], ...]
+
+
+def _apply_fallbacks(model: BaseModel, fallbacks: _Fallbacks) -> None:
+    """Fill empty target fields from the first non-empty string alternative."""
+    # Validation is complete, so write the field values straight into __dict__ in one update.
+    # Like the previous object.__setattr__ calls, this leaves model_fields_set untouched.
+    values = model.__dict__
+    updates: dict[str, str] = {}
+    for target, sources in fallbacks:
+        if values[target]:
+            continue
+        for source in sources:
+            value = values[source]
+            if value and isinstance(value, str):
+                updates[target] = value
+                break
+    if updates:
+        values.update(updates)
+
+
 class MarketingStrategy(BaseModel):
     """Structured representation of the positioning work from the strategy agent."""
 
@@ -45,6 +70,9 @@ class EmailCampaign(BaseModel):
 class SocialPost(BaseModel):
     """Single social post variant."""
 
+    # Models repeated in lists declare empty __slots__ to drop the per-instance __weakref__
+    # slot; BaseModel keeps field values in __dict__, so this is as slotted as it gets
+    __slots__ = ()
     model_config = ConfigDict(extra="ignore")
 
     platform: str = Field(default="", description="Channel, e.g. LinkedIn, Instagram, Xiaohongshu.")
@@ -61,6 +89,13 @@ class SocialPost(BaseModel):
     image_suggestion: Optional[str] = Field(default=None, description="Suggested image description.")
     visual_prompt: Optional[str] = Field(default=None, description="Visual prompt for image generation.")
     hashtags: Optional[List[str]] = Field(default=None, description="Hashtags for the post.")
+
+    # Normalize agent field variants onto the canonical fields
+    _FALLBACKS: ClassVar[_Fallbacks] = (
+        ("platform", ("channel",)),
+        ("body", ("post_text", "copy_text", "content")),
+        ("cta", ("call_to_action",)),
+    )
     
     @field_validator("hashtags", mode="before")
     @classmethod
@@ -69,26 +104,12 @@ class SocialPost(BaseModel):
         if v is None:
             return None
         if isinstance(v, str):
-            # Split by space or comma, filter empty strings
-            parts = v.replace(",", " ").split()
-            return [p.strip() for p in parts if p.strip()]
+            # Split by whitespace, commas or semicolons; split() already drops empty parts
+            return v.translate(_HASHTAG_SEPARATORS).split()
         return v
     
     def model_post_init(self, __context: Any) -> None:
-        # Normalize: if channel is set but platform is empty, use channel as platform
-        if self.channel and not self.platform:
-            object.__setattr__(self, "platform", self.channel)
-        # Normalize body from alternative fields
-        if not self.body:
-            if self.post_text:
-                object.__setattr__(self, "body", self.post_text)
-            elif self.copy_text:
-                object.__setattr__(self, "body", self.copy_text)
-            elif self.content:
-                object.__setattr__(self, "body", self.content)
-        # Normalize cta from alternative field
-        if not self.cta and self.call_to_action:
-            object.__setattr__(self, "cta", self.call_to_action)
+        _apply_fallbacks(self, self._FALLBACKS)
 
 
 class CopywritingContent(BaseModel):
@@ -108,6 +129,7 @@ class CopywritingContent(BaseModel):
 class ImagePrompt(BaseModel):
     """Prompt engineering payload for DALL-E/MJ style generators."""
 
+    __slots__ = ()
     model_config = ConfigDict(extra="ignore")
 
     prompt_id: str = Field(default="", description="Stable identifier used for matching assets.")
@@ -120,9 +142,10 @@ class ImagePrompt(BaseModel):
 class GeneratedImage(BaseModel):
     """Metadata for actual rendered images (if any)."""
 
+    __slots__ = ()
     model_config = ConfigDict(extra="ignore")
 
-    prompt_id: str = Field(default="")
+    prompt_id: str = ""
     url: str = Field(default="", description="URL or local file reference to the rendered image.")
     local_path: Optional[str] = Field(default=None, description="Local filesystem path.")
     revised_prompt: Optional[str] = Field(None, description="Model-adjusted prompt text.")
@@ -141,9 +164,10 @@ class ImageContent(BaseModel):
 class VideoScene(BaseModel):
     """Single scene in a three-act marketing video."""
 
+    __slots__ = ()
     model_config = ConfigDict(extra="ignore")
 
-    scene_number: int = Field(default=0)
+    scene_number: int = 0
     act: str = Field(default="", description="Problem / Solution / Transformation")
     visuals: str = Field(default="", description="Camera + action direction.")
     voiceover: str = Field(default="", description="Narration copy.")
@@ -171,23 +195,16 @@ class VideoScene(BaseModel):
     shot_description: Optional[str] = Field(default=None, description="Shot description.")
     visual_instructions: Optional[str] = Field(default=None, description="Visual instructions.")
     sound_instructions: Optional[str] = Field(default=None, description="Sound instructions.")
+
+    # Normalize agent field variants onto the canonical fields; dialogue only counts when it is a plain string
+    _FALLBACKS: ClassVar[_Fallbacks] = (
+        ("voiceover", ("audio_narration", "narration", "dialogue")),
+        ("screen_text", ("on_screen_text",)),
+        ("visuals", ("visual",)),
+    )
     
     def model_post_init(self, __context: Any) -> None:
-        # Normalize voiceover from alternative fields
-        if not self.voiceover:
-            if self.audio_narration:
-                object.__setattr__(self, "voiceover", self.audio_narration)
-            elif self.narration:
-                object.__setattr__(self, "voiceover", self.narration)
-            elif self.dialogue and isinstance(self.dialogue, str):
-                # Use dialogue as voiceover if it's a simple string
-                object.__setattr__(self, "voiceover", self.dialogue)
-        # Normalize screen_text from alternative field
-        if not self.screen_text and self.on_screen_text:
-            object.__setattr__(self, "screen_text", self.on_screen_text)
-        # Normalize visuals from alternative field
-        if not self.visuals and self.visual:
-            object.__setattr__(self, "visuals", self.visual)
+        _apply_fallbacks(self, self._FALLBACKS)
 
 
 class VideoScript(BaseModel):
@@ -207,14 +224,14 @@ class CampaignPackage(BaseModel):
 
     model_config = ConfigDict(extra="ignore")
 
-    campaign_id: str = Field(...)
-    topic: str = Field(...)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    campaign_id: str
+    topic: str
+    created_at: datetime = Field(default_factory=partial(datetime.now, timezone.utc))
     strategy: MarketingStrategy
     copywriting: CopywritingContent
     images: ImageContent
     video: VideoScript
-    package_path: Optional[str] = Field(default=None, description="Filesystem location for persisted assets.")
+    package_path: Optional[str] = None  # Filesystem location for persisted assets
 
     def with_package_path(self, path: str) -> "CampaignPackage":
         """Return a copy with an updated package path."""
@@ -4,25 +4,71 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import copy
+import hashlib
 import inspect
+import json
 import os
+import random
+import re
+import string
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
-from typing import Annotated, Any, Optional, List
+from typing import Annotated, Any, Iterable, Mapping, Optional
 
 from agent_framework import ai_function
 
 from .schemas import CampaignPackage
-from .utils import dump_json, ensure_directory, slugify, timestamp_id
+from .utils import ensure_directory, slugify, timestamp_id, to_json_bytes
+
+
+# Fields kept from each Tavily result, with defaults for missing keys
+_SEARCH_RESULT_FIELDS = (("title", ""), ("url", ""), ("content", ""), ("score", 0))
 
 
 class TavilySearchTools:
-    """Web search tool using Tavily API for market research and content gathering."""
+    """Web search tool using Tavily API for market research and content gathering.
 
-    def __init__(self, *, api_key: Optional[str] = None) -> None:
+    Successful results are cached in memory (LRU with a TTL), keyed by the
+    normalized query, search depth and result count, so overlapping queries
+    from different agents cost one API call. Set ``cache_path`` or
+    TAVILY_CACHE_PATH to also persist the cache as JSONL across runs; the file
+    is rewritten with just the live entries once it grows past twice the cache
+    size.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        cache_size: int = 256,
+        cache_ttl: float = 900.0,
+        cache_path: Optional[str] = None,
+        batch_concurrency: int = 5,
+    ) -> None:
         self._api_key = api_key or os.getenv("Tvly_API_KEY")
         self._client: Any = None
+        self._cache: OrderedDict[tuple[str, str, int], tuple[float, dict[str, Any]]] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        # Agents may search from several threads at once (tool calls, pre-fetching)
+        self._cache_lock = threading.Lock()
+        cache_path = cache_path or os.getenv("TAVILY_CACHE_PATH")
+        self._cache_path: Optional[Path] = Path(cache_path) if cache_path else None
+        # Lines currently in the JSONL file; it is compacted once this outgrows the cache
+        self._persisted_lines = 0
+        if self._cache_path is not None:
+            self._load_persisted_cache()
+        # Upper bound on concurrent Tavily calls from one web_search_many batch
+        self._batch_concurrency = max(1, batch_concurrency)
         self._search_tool = self._create_search_tool()
+        self._search_many_tool = self._create_search_many_tool()
 
     def _get_client(self) -> Any:
         """Lazily initialize the Tavily client."""
@@ -41,6 +87,96 @@ class TavilySearchTools:
         """Return the bound tool function for use with ChatAgent."""
         return self._search_tool
 
+    @property
+    def search_many(self) -> Any:
+        """Return the bound batched search tool function for use with ChatAgent."""
+        return self._search_many_tool
+
+    def run_search(
+        self,
+        query: str,
+        *,
+        search_depth: str = "basic",
+        max_results: int = 5,
+    ) -> dict[str, Any]:
+        """Run a search directly, outside of an agent tool call."""
+        return self._do_search(query, search_depth, max_results)
+
+    def _cache_get(self, key: tuple[str, str, int]) -> Optional[dict[str, Any]]:
+        """Return a copy of a fresh cached response, dropping it if expired."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, response = entry
+            if time.time() - stored_at >= self._cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return copy.deepcopy(response)
+
+    def _cache_put(self, key: tuple[str, str, int], response: dict[str, Any]) -> None:
+        """Cache a successful response and append it to the persisted cache if enabled."""
+        stored_at = time.time()
+        with self._cache_lock:
+            self._cache[key] = (stored_at, copy.deepcopy(response))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            if self._cache_path is not None:
+                if self._persisted_lines >= 2 * self._cache_size:
+                    # The new entry is already in memory, so the rewrite persists it too
+                    self._compact_persisted_cache()
+                    return
+                try:
+                    with self._cache_path.open("a", encoding="utf-8") as handle:
+                        handle.write(self._cache_line(key, stored_at, response))
+                    self._persisted_lines += 1
+                except OSError:
+                    pass  # Persistence is best effort; the in-memory cache still works
+
+    @staticmethod
+    def _cache_line(key: tuple[str, str, int], stored_at: float, response: dict[str, Any]) -> str:
+        return json.dumps({"key": list(key), "ts": stored_at, "response": response}, ensure_ascii=False) + "\n"
+
+    def _compact_persisted_cache(self) -> None:
+        """Atomically rewrite the JSONL file with just the in-memory entries, oldest first."""
+        tmp_path = self._cache_path.with_suffix(self._cache_path.suffix + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                handle.writelines(
+                    self._cache_line(key, stored_at, response)
+                    for key, (stored_at, response) in self._cache.items()
+                )
+            os.replace(tmp_path, self._cache_path)
+            self._persisted_lines = len(self._cache)
+        except OSError:
+            pass  # Keep appending to the existing file; compaction is retried on the next put
+
+    def _load_persisted_cache(self) -> None:
+        """Load unexpired entries from the JSONL cache file, oldest first."""
+        try:
+            lines = self._cache_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        self._persisted_lines = len(lines)
+        now = time.time()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                key = (str(entry["key"][0]), str(entry["key"][1]), int(entry["key"][2]))
+                stored_at, response = float(entry["ts"]), entry["response"]
+            except (ValueError, KeyError, IndexError, TypeError):
+                continue
+            if now - stored_at < self._cache_ttl:
+                self._cache[key] = (stored_at, response)
+                self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        # Drop expired, superseded and evicted lines so startup replays stay bounded
+        if self._persisted_lines > len(self._cache):
+            self._compact_persisted_cache()
+
     def _create_search_tool(self) -> Any:
         """Create a bound ai_function tool for web search."""
 
@@ -49,25 +185,71 @@ class TavilySearchTools:
             query: Annotated[str, "The search query. Be specific and include relevant keywords for better results."],
             search_depth: Annotated[str, "Search depth: 'basic' for quick results, 'advanced' for comprehensive research"] = "basic",
             max_results: Annotated[int, "Maximum number of results to return (1-10)"] = 5,
+            use_cache: Annotated[bool, "Set to false to bypass cached results and force a fresh search"] = True,
         ) -> dict[str, Any]:
             """Search the web using Tavily and return relevant results."""
-            return self._do_search(query, search_depth, max_results)
+            return self._do_search(query, search_depth, max_results, use_cache=use_cache)
 
         return web_search
 
+    def _create_search_many_tool(self) -> Any:
+        """Create a bound ai_function tool that runs several searches concurrently."""
+
+        @ai_function(description="Run several web searches at once and return one result per query, in the same order. Prefer this over repeated web_search calls whenever you have 2 or more queries.")
+        async def web_search_many(
+            queries: Annotated[list[str], "The search queries. Be specific and include relevant keywords for better results."],
+            search_depth: Annotated[str, "Search depth: 'basic' for quick results, 'advanced' for comprehensive research"] = "basic",
+            max_results: Annotated[int, "Maximum number of results to return per query (1-10)"] = 5,
+        ) -> list[dict[str, Any]]:
+            """Search the web using Tavily for every query and return the results in order."""
+            return await self._do_search_many(queries, search_depth, max_results)
+
+        return web_search_many
+
+    async def _do_search_many(
+        self,
+        queries: list[str],
+        search_depth: str = "basic",
+        max_results: int = 5,
+    ) -> list[dict[str, Any]]:
+        """Run the distinct queries concurrently in worker threads, bounded by the batch limit.
+
+        Each query goes through :meth:`_do_search`, so cached queries return
+        immediately and failures come back as per-query error results.
+        """
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+
+        async def search_one(query: str) -> dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self._do_search, query, search_depth, max_results)
+
+        unique_queries = list(dict.fromkeys(queries))
+        responses = await asyncio.gather(*(search_one(query) for query in unique_queries))
+        by_query = dict(zip(unique_queries, responses))
+        return [by_query[query] for query in queries]
+
     def _do_search(
         self,
         query: str,
         search_depth: str = "basic",
         max_results: int = 5,
+        *,
+        use_cache: bool = True,
     ) -> dict[str, Any]:
         """Internal method to perform web search."""
+        # Clamp max_results to valid range
+        max_results = max(1, min(10, max_results))
+        
+        key = (query.strip().lower(), search_depth, max_results)
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                cached["query"] = query
+                return cached
+        
         try:
             client = self._get_client()
             
-            # Clamp max_results to valid range
-            max_results = max(1, min(10, max_results))
-            
             response = client.search(
                 query=query,
                 search_depth=search_depth,
@@ -75,16 +257,12 @@ class TavilySearchTools:
             )
             
             # Format results for agent consumption
-            results = []
-            for item in response.get("results", []):
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("url", ""),
-                    "content": item.get("content", ""),
-                    "score": item.get("score", 0),
-                })
+            results = [
+                {key: item.get(key, default) for key, default in _SEARCH_RESULT_FIELDS}
+                for item in response.get("results", ())
+            ]
             
-            return {
+            result = {
                 "query": query,
                 "results": results,
                 "answer": response.get("answer", ""),
@@ -102,19 +280,281 @@ class TavilySearchTools:
                 "results": [],
                 "answer": "",
             }
+        
+        # Only successful responses are cached so failures are retried on the next call
+        self._cache_put(key, result)
+        return result
+
+
+_MAX_POLL_DELAY = 15.0  # Seconds; cap for the Sora status poll backoff
+_MAX_POLL_FAILURES = 3  # Non-throttling status errors tolerated before giving up
+_RATE_LIMIT_RE = re.compile(r"rate.?limit|quota", re.IGNORECASE)
+
+
+def _is_rate_limited(response: Any) -> bool:
+    """Tell throttling responses (retry later) apart from hard failures."""
+    return response.status_code == 429 or bool(_RATE_LIMIT_RE.search(response.text or ""))
+
+
+def _retry_after_seconds(response: Any, *, default: float) -> float:
+    """Return the ``Retry-After`` delay in seconds, or ``default`` if absent or not numeric."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _create_http_session() -> Any:
+    """Build a keep-alive ``requests`` session with pooled connections.
+
+    GETs (status polls and downloads) are retried with exponential backoff on
+    throttling and transient server errors. POSTs are not retried, because
+    resubmitting a generation job could start (and bill) a duplicate.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Base64 characters per decode slice; a multiple of 4, so each slice decodes on its own (to 48 KiB)
+_BASE64_SLICE = 64 * 1024
+# Line breaks or other whitespace in a payload would shift the slices off 4-character boundaries
+_BASE64_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _write_chunks(path: Path, chunks: Iterable[bytes]) -> None:
+    """Write ``chunks`` to ``path`` as they arrive, removing the partial file on failure."""
+    try:
+        with path.open("wb") as handle:
+            for chunk in chunks:
+                if chunk:
+                    handle.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+def _limit_chunks(chunks: Iterable[bytes], max_bytes: int) -> Iterable[bytes]:
+    """Pass ``chunks`` through, raising ValueError once more than ``max_bytes`` have arrived."""
+    received = 0
+    for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ValueError(f"Download exceeds the {max_bytes} byte limit")
+        yield chunk
+
+
+def _looks_like_mp4(head: bytes) -> bool:
+    """Sniff an MP4 from the start of a body: the "ftyp" box type follows the 4-byte box size."""
+    return len(head) >= 8 and memoryview(head)[4:8] == b"ftyp"
+
+
+def _download_to_file(
+    session: Any,
+    url: str,
+    path: Path,
+    *,
+    timeout: float,
+    max_bytes: Optional[int] = None,
+) -> bool:
+    """Stream ``url`` to ``path`` without buffering the body; return whether it succeeded.
+
+    With ``max_bytes`` set, a larger declared Content-Length is rejected before
+    any body is read, and a body that grows past the limit is aborted; both
+    raise ValueError and leave no file behind.
+    """
+    with session.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            return False
+        chunks = response.iter_content(_DOWNLOAD_CHUNK_SIZE)
+        if max_bytes is not None:
+            try:
+                declared = int(response.headers.get("Content-Length", 0))
+            except (TypeError, ValueError):
+                declared = 0
+            if declared > max_bytes:
+                raise ValueError(f"Download of {declared} bytes exceeds the {max_bytes} byte limit")
+            chunks = _limit_chunks(chunks, max_bytes)
+        _write_chunks(path, chunks)
+    return True
+
+
+def _write_base64(path: Path, data: str) -> None:
+    """Decode base64 ``data`` to ``path`` slice by slice instead of materializing the whole file."""
+    if _BASE64_WHITESPACE_RE.search(data):
+        data = _BASE64_WHITESPACE_RE.sub("", data)
+    _write_chunks(
+        path,
+        (base64.b64decode(data[start : start + _BASE64_SLICE]) for start in range(0, len(data), _BASE64_SLICE)),
+    )
+
+
+@dataclass(slots=True)
+class _PendingJob:
+    """A submitted Sora job waiting for a terminal status."""
+
+    session: Any
+    status_url: str
+    headers: dict[str, str]
+    next_poll: float
+    delay: float = 1.0
+    failures: int = 0
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class _StatusPoller:
+    """Polls every in-flight Sora job of one endpoint from a single background thread.
+
+    Callers block on their job's event instead of each running a poll loop. The
+    thread starts with the first job and exits once no jobs are left.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: list[_PendingJob] = []
+        self._wakeup = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def wait(self, session: Any, status_url: str, headers: dict[str, str], *, timeout: float) -> Optional[str]:
+        """Block until the job completes; return None on success, else an error message."""
+        job = _PendingJob(session, status_url, headers, next_poll=time.monotonic())
+        with self._wakeup:
+            self._jobs.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sora-status-poller", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        finished = job.done.wait(timeout)
+        with self._wakeup:
+            if job in self._jobs:
+                self._jobs.remove(job)
+        return job.error if finished else "Video generation timed out"
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._wakeup:
+                    if not self._jobs:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    due = [job for job in self._jobs if job.next_poll <= now]
+                    if not due:
+                        self._wakeup.wait(min(job.next_poll for job in self._jobs) - now)
+                        continue
+                for job in due:
+                    try:
+                        self._poll(job)
+                    except Exception as e:
+                        # e.g. a malformed status body; fail this job but keep polling the others
+                        job.error = f"Status check failed: {e}"
+                        job.done.set()
+                with self._wakeup:
+                    self._jobs = [job for job in self._jobs if not job.done.is_set()]
+        finally:
+            # If the loop dies unexpectedly, let the next wait() start a fresh thread
+            with self._wakeup:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    @staticmethod
+    def _poll(job: _PendingJob) -> None:
+        """Check one job's status, then finish it or schedule its next poll.
+
+        Polls start fast and back off with jitter, so short jobs are noticed
+        quickly and long ones don't hammer the API.
+        """
+        try:
+            response = job.session.get(job.status_url, headers=job.headers, timeout=30)
+        except Exception as e:
+            job.error = f"Status check failed: {e}"
+            job.done.set()
+            return
+        if response.status_code != 200:
+            if _is_rate_limited(response):
+                # Throttled: wait as instructed and retry without counting a failure
+                job.next_poll = time.monotonic() + _retry_after_seconds(response, default=job.delay)
+                return
+            job.failures += 1
+            if job.failures >= _MAX_POLL_FAILURES:
+                job.error = f"Status check failed: {response.status_code}"
+                job.done.set()
+                return
+        else:
+            status_data = response.json()
+            status = status_data.get("status", "unknown")
+            if status == "completed":
+                job.done.set()
+                return
+            if status == "failed":
+                job.error = f"Video generation failed: {status_data.get('error', 'Unknown error')}"
+                job.done.set()
+                return
+
+        # Still processing (or a transient failure), poll again later
+        job.next_poll = time.monotonic() + job.delay + random.uniform(0, job.delay * 0.1)
+        job.delay = min(job.delay * 1.5, _MAX_POLL_DELAY)
+
+
+@dataclass(slots=True)
+class _SubmissionLimits:
+    """Generation slots, submission spacing and the status poller for one Sora endpoint."""
+
+    max_concurrency: int
+    min_submit_interval: float
+    slots: threading.BoundedSemaphore = field(init=False)
+    submit_lock: threading.Lock = field(default_factory=threading.Lock)
+    last_submit: float = 0.0
+    poller: _StatusPoller = field(default_factory=_StatusPoller)
+
+    def __post_init__(self) -> None:
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def throttle(self) -> None:
+        """Block until at least ``min_submit_interval`` has passed since the last job submission."""
+        with self.submit_lock:
+            wait = self.last_submit + self.min_submit_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_submit = time.monotonic()
+
+
+# Limits keyed by endpoint, shared by every instance that targets the same deployment
+_SORA_LIMITS: dict[str, _SubmissionLimits] = {}
+_SORA_LIMITS_LOCK = threading.Lock()
 
 
 class SoraVideoGenerationTools:
     """Tool for generating videos using Azure OpenAI Sora-2 model.
     
     Note: Sora-2 API has concurrency limits (max 2 concurrent tasks).
-    This tool uses a lock to ensure videos are generated sequentially.
+    A semaphore per endpoint caps in-flight jobs at that limit (override with
+    SORA_MAX_CONCURRENCY), and job submissions to an endpoint are spaced at
+    least SORA_MIN_SUBMIT_INTERVAL seconds apart. Instances targeting
+    different deployments do not wait on each other.
     """
 
-    # Class-level lock to ensure sequential video generation
-    # This prevents concurrent API calls that would hit rate limits
-    import threading
-    _generation_lock = threading.Lock()
+    # Defaults; SORA_MAX_CONCURRENCY / SORA_MIN_SUBMIT_INTERVAL are read when an endpoint's limits
+    # are first created, i.e. after the CLI has loaded .env
+    _max_concurrency = 2
+    _min_submit_interval = 1.0
+
+    # Shared across instances so polls and downloads reuse pooled connections
+    _session: Any = None
 
     def __init__(
         self,
@@ -133,6 +573,12 @@ class SoraVideoGenerationTools:
         self._default_size = default_size
         self._max_seconds = max_seconds
         self._generated_videos: list[dict[str, Any]] = []
+        self._limits = self._limits_for(self._endpoint or "")
+        # Built once and shared read-only by the job POST, status polls and content GET
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self._api_key}",
+        }
         
         # Create bound tool function
         self._generate_video_tool = self._create_generate_video_tool()
@@ -152,18 +598,38 @@ class SoraVideoGenerationTools:
         self._output_dir = Path(output_dir)
         ensure_directory(self._output_dir)
 
+    @classmethod
+    def _get_session(cls) -> Any:
+        """Lazily create the pooled HTTP session."""
+        if cls._session is None:
+            cls._session = _create_http_session()
+        return cls._session
+
+    @classmethod
+    def _limits_for(cls, endpoint: str) -> _SubmissionLimits:
+        """Return the submission limits shared by every instance targeting ``endpoint``."""
+        with _SORA_LIMITS_LOCK:
+            limits = _SORA_LIMITS.get(endpoint)
+            if limits is None:
+                limits = _SORA_LIMITS[endpoint] = _SubmissionLimits(
+                    int(os.getenv("SORA_MAX_CONCURRENCY") or cls._max_concurrency),
+                    float(os.getenv("SORA_MIN_SUBMIT_INTERVAL") or cls._min_submit_interval),
+                )
+            return limits
+
     def _create_generate_video_tool(self) -> Any:
         """Create a bound ai_function tool."""
         
         @ai_function(description="Generate a marketing video clip using AI Sora-2 model. Returns the file path of the generated video. The prompt MUST be in English. Each video clip should be max 10 seconds.")
-        def generate_video(
+        async def generate_video(
             prompt: Annotated[str, "Detailed video generation prompt in English. Must describe the scene, action, camera movement, and atmosphere."],
             scene_id: Annotated[str, "Unique identifier for this scene, e.g. scene-01"] = "scene-01",
             seconds: Annotated[int, "Video duration in seconds (1-10)"] = 5,
             size: Annotated[str, "Video resolution: '1280x720' for landscape 720p, '720x1280' for portrait"] = "1280x720",
         ) -> dict[str, Any]:
             """Generate a video using Azure Sora-2 model and save to disk."""
-            return self._do_generate_video(prompt, scene_id, seconds, size)
+            # Blocking HTTP work runs on a worker thread, so parallel tool calls overlap
+            return await asyncio.to_thread(self._do_generate_video, prompt, scene_id, seconds, size)
         
         return generate_video
     
@@ -176,11 +642,8 @@ class SoraVideoGenerationTools:
     ) -> dict[str, Any]:
         """Internal method to generate video.
         
-        Uses a lock to ensure sequential generation due to API concurrency limits.
+        Blocks until a generation slot is free, due to API concurrency limits.
         """
-        import requests
-        import time
-        
         if self._output_dir is None:
             raise RuntimeError(
                 "Video output directory not set. Call set_output_dir() first."
@@ -199,8 +662,10 @@ class SoraVideoGenerationTools:
         valid_seconds = [4, 8, 12]
         seconds = min(valid_seconds, key=lambda x: abs(x - seconds))
         
-        # Acquire lock to ensure sequential generation (API concurrency limit)
-        with SoraVideoGenerationTools._generation_lock:
+        session = self._get_session()
+        
+        # Acquire a generation slot (API concurrency limit)
+        with self._limits.slots:
             # Build request payload
             payload = {
                 "prompt": prompt,
@@ -209,16 +674,12 @@ class SoraVideoGenerationTools:
                 "model": self._deployment_name,
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self._api_key}",
-            }
-            
             # Make API request to create video generation job
-            response = requests.post(
+            self._limits.throttle()
+            response = session.post(
                 self._endpoint,
                 json=payload,
-                headers=headers,
+                headers=self._headers,
                 timeout=60,
             )
             
@@ -240,86 +701,57 @@ class SoraVideoGenerationTools:
                     "local_path": None,
                 }
             
-            # Poll for video completion (Sora-2 uses async generation)
-            status_url = f"{self._endpoint}/{video_id}"
-            max_wait_time = 300  # 5 minutes max wait
-            poll_interval = 5  # Check every 5 seconds
-            elapsed = 0
-            
-            while elapsed < max_wait_time:
-                status_response = requests.get(status_url, headers=headers, timeout=30)
-                if status_response.status_code != 200:
-                    return {
-                        "scene_id": scene_id,
-                        "error": f"Status check failed: {status_response.status_code}",
-                        "video_id": video_id,
-                        "local_path": None,
-                    }
-                
-                status_data = status_response.json()
-                status = status_data.get("status", "unknown")
-                
-                if status == "completed":
-                    break
-                elif status == "failed":
-                    return {
-                        "scene_id": scene_id,
-                        "error": f"Video generation failed: {status_data.get('error', 'Unknown error')}",
-                        "video_id": video_id,
-                        "local_path": None,
-                    }
-                
-                # Still processing, wait and retry
-                time.sleep(poll_interval)
-                elapsed += poll_interval
-            
-            if elapsed >= max_wait_time:
+            # Wait for video completion (Sora-2 uses async generation); the endpoint's
+            # shared poller checks all in-flight jobs from one thread
+            error = self._limits.poller.wait(
+                session,
+                f"{self._endpoint}/{video_id}",
+                self._headers,
+                timeout=300,  # 5 minutes max wait
+            )
+            if error is not None:
                 return {
                     "scene_id": scene_id,
-                    "error": "Video generation timed out",
+                    "error": error,
                     "video_id": video_id,
                     "local_path": None,
                 }
             
             # Video is ready, get the content URL
             content_url = f"{self._endpoint}/{video_id}/content"
-            content_response = requests.get(content_url, headers=headers, timeout=120, allow_redirects=True)
-            
             filename = f"{timestamp_id()}_{slugify(scene_id)}.mp4"
             filepath = self._output_dir / filename
             
             video_url: Optional[str] = None
             local_path: Optional[str] = None
             
-            if content_response.status_code == 200:
-                content_type = content_response.headers.get("Content-Type", "")
-                
-                if "video" in content_type or content_response.content[:4] == b'\x00\x00\x00':
-                    # Direct video content
-                    filepath.write_bytes(content_response.content)
-                    local_path = str(filepath)
-                    video_url = local_path
-                else:
-                    # Might be a redirect URL or JSON response
-                    try:
-                        content_data = content_response.json()
-                        if "url" in content_data:
-                            video_url = content_data["url"]
-                            # Download from URL
-                            video_download = requests.get(video_url, timeout=120)
-                            if video_download.status_code == 200:
-                                filepath.write_bytes(video_download.content)
-                                local_path = str(filepath)
-                    except:
-                        # If not JSON, check if it's the URL in text
-                        video_url = content_response.text.strip()
+            with session.get(content_url, headers=self._headers, timeout=120, allow_redirects=True, stream=True) as content_response:
+                if content_response.status_code == 200:
+                    content_type = content_response.headers.get("Content-Type", "").lower()
+                    chunks = content_response.iter_content(_DOWNLOAD_CHUNK_SIZE)
+                    first_chunk = next(chunks, b"")
+                    
+                    # Redirects were already followed, so this is usually the video itself
+                    if content_type.startswith(("video/", "application/octet-stream")) or _looks_like_mp4(first_chunk):
+                        # Direct video content, streamed to disk in a single pass
+                        _write_chunks(filepath, chain((first_chunk,), chunks))
+                        local_path = str(filepath)
+                        video_url = local_path
+                    else:
+                        # A small JSON or plain-text body pointing at the video; only this case needs a second GET
+                        body = first_chunk + b"".join(chunks)
+                        if "json" in content_type or body.lstrip().startswith(b"{"):
+                            try:
+                                video_url = json.loads(body).get("url")
+                            except (ValueError, AttributeError):
+                                video_url = None
+                        else:
+                            video_url = body.decode("utf-8", errors="replace").strip() or None
                         if video_url and video_url.startswith("http"):
                             try:
-                                video_download = requests.get(video_url, timeout=120)
-                                if video_download.status_code == 200:
-                                    filepath.write_bytes(video_download.content)
+                                if _download_to_file(session, video_url, filepath, timeout=120):
                                     local_path = str(filepath)
-                            except:
+                            except Exception:
                                 pass
             
             result = {
@@ -336,9 +768,15 @@ class SoraVideoGenerationTools:
             return result
 
 
+_MAX_IMAGE_DOWNLOAD_BYTES = 50 * 1024 * 1024  # Generated images are a few MB; anything larger is not an image
+
+
 class FluxImageGenerationTools:
     """Tool for generating images using Azure OpenAI FLUX model."""
 
+    # Shared across instances so image downloads reuse pooled connections
+    _session: Any = None
+
     def __init__(
         self,
         *,
@@ -347,6 +785,7 @@ class FluxImageGenerationTools:
         deployment_name: Optional[str] = None,
         output_dir: Optional[str] = None,
         default_size: str = "1024x1024",
+        batch_concurrency: int = 4,
     ) -> None:
         self._endpoint = endpoint or os.getenv("AZURE_IMAGE_ENDPOINT")
         self._api_key = api_key or os.getenv("AZURE_IMAGE_API_KEY")
@@ -355,9 +794,19 @@ class FluxImageGenerationTools:
         self._default_size = default_size
         self._client: Any = None
         self._generated_images: list[dict[str, str]] = []
+        # Upper bound on concurrent generations from one generate_images batch
+        self._batch_concurrency = max(1, batch_concurrency)
         
-        # Create bound tool function
+        # Create bound tool functions
         self._generate_image_tool = self._create_generate_image_tool()
+        self._generate_images_tool = self._create_generate_images_tool()
+
+    @classmethod
+    def _get_session(cls) -> Any:
+        """Lazily create the pooled HTTP session."""
+        if cls._session is None:
+            cls._session = _create_http_session()
+        return cls._session
 
     def _get_client(self) -> Any:
         """Lazily initialize the OpenAI client."""
@@ -380,6 +829,11 @@ class FluxImageGenerationTools:
     def generate_image(self) -> Any:
         """Return the bound tool function for use with ChatAgent."""
         return self._generate_image_tool
+
+    @property
+    def generate_images(self) -> Any:
+        """Return the bound batched tool function for use with ChatAgent."""
+        return self._generate_images_tool
     
     def set_output_dir(self, output_dir: str) -> None:
         """Set the output directory for generated images."""
@@ -390,15 +844,47 @@ class FluxImageGenerationTools:
         """Create a bound ai_function tool."""
         
         @ai_function(description="Generate a marketing image using AI. Returns the file path and URL of the generated image. The prompt MUST be in English.")
-        def generate_image(
+        async def generate_image(
             prompt: Annotated[str, "Detailed image generation prompt in English. Must be descriptive and include lighting, composition, and atmosphere details."],
             prompt_id: Annotated[str, "Unique identifier for this image, e.g. prompt-01"] = "prompt-01",
             size: Annotated[str, "Image size, e.g., 1024x1024, 1792x1024"] = "1024x1024",
         ) -> dict[str, Any]:
             """Generate an image using Azure FLUX model and save to disk."""
-            return self._do_generate_image(prompt, prompt_id, size)
+            # Blocking client call runs on a worker thread, so parallel tool calls overlap
+            return await asyncio.to_thread(self._do_generate_image, prompt, prompt_id, size)
         
         return generate_image
+
+    def _create_generate_images_tool(self) -> Any:
+        """Create a bound ai_function tool that generates several images concurrently."""
+
+        @ai_function(description="Generate several marketing images at once using AI and return one result per item, in the same order. Prefer this over repeated generate_image calls. Every prompt MUST be in English.")
+        async def generate_images(
+            prompts: Annotated[list[dict[str, str]], "Images to generate, each an object with 'prompt' (detailed English prompt) and 'prompt_id' (e.g. prompt-01), optionally 'size'"],
+        ) -> list[dict[str, Any]]:
+            """Generate every requested image using Azure FLUX model and save them to disk."""
+            return await self._do_generate_image_many(prompts)
+
+        return generate_images
+
+    async def _do_generate_image_many(self, items: list[dict[str, str]]) -> list[dict[str, Any]]:
+        """Generate the images concurrently in worker threads, bounded by the batch limit.
+
+        Each item goes through :meth:`_do_generate_image`, so failures come back
+        as per-item error results.
+        """
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+
+        async def generate_one(index: int, item: dict[str, str]) -> dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self._do_generate_image,
+                    item.get("prompt", ""),
+                    item.get("prompt_id") or f"prompt-{index:02d}",
+                    item.get("size") or self._default_size,
+                )
+
+        return list(await asyncio.gather(*(generate_one(index, item) for index, item in enumerate(items, 1))))
     
     def _do_generate_image(
         self,
@@ -438,19 +924,24 @@ class FluxImageGenerationTools:
             local_path: Optional[str] = None
             
             if hasattr(image_data, "b64_json") and image_data.b64_json:
-                image_bytes = base64.b64decode(image_data.b64_json)
-                filepath.write_bytes(image_bytes)
+                _write_base64(filepath, image_data.b64_json)
                 url = str(filepath)
                 local_path = str(filepath)
             elif hasattr(image_data, "url") and image_data.url:
                 url = image_data.url
                 # Try to download and save locally
                 try:
-                    import requests
-                    img_response = requests.get(url, timeout=60)
-                    if img_response.status_code == 200:
-                        filepath.write_bytes(img_response.content)
+                    if _download_to_file(self._get_session(), url, filepath, timeout=60, max_bytes=_MAX_IMAGE_DOWNLOAD_BYTES):
                         local_path = str(filepath)
+                except ValueError as e:
+                    # Oversized response: report it rather than hand back an unusable URL
+                    return {
+                        "prompt_id": prompt_id,
+                        "error": f"Image download rejected: {e}",
+                        "url": url,
+                        "local_path": None,
+                        "prompt": prompt,
+                    }
                 except Exception:
                     pass  # URL exists but couldn't download locally
             
@@ -529,6 +1020,85 @@ class ImageGenerationTools:
         return {"url": getattr(data, "url", None), "revised_prompt": getattr(data, "revised_prompt", prompt)}
 
 
+_PERSIST_WORKERS = 8  # Concurrent file writes when persisting a campaign package
+
+
+def _write_file(job: tuple[Path, str | bytes]) -> None:
+    """Write one ``(path, data)`` packaging job; text is written as UTF-8."""
+    path, data = job
+    if isinstance(data, bytes):
+        path.write_bytes(data)
+    else:
+        path.write_text(data, encoding="utf-8")
+
+
+# Email document with inline CSS, built once at import; only $subject, $preview and $body vary per email
+_EMAIL_HTML_TEMPLATE = string.Template('''<!DOCTYPE html>
+<html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta http-equiv="X-UA-Compatible" content="IE=edge">
+    <meta name="x-apple-disable-message-reformatting">
+    <title>$subject</title>
+    <!--[if mso]>
+    <noscript>
+        <xml>
+            <o:OfficeDocumentSettings>
+                <o:PixelsPerInch>96</o:PixelsPerInch>
+            </o:OfficeDocumentSettings>
+        </xml>
+    </noscript>
+    <![endif]-->
+    <style type="text/css">
+        /* Reset styles */
+        body, table, td, a { -webkit-text-size-adjust: 100%; -ms-text-size-adjust: 100%; }
+        table, td { mso-table-lspace: 0pt; mso-table-rspace: 0pt; }
+        img { -ms-interpolation-mode: bicubic; border: 0; height: auto; line-height: 100%; outline: none; text-decoration: none; }
+        body { margin: 0 !important; padding: 0 !important; width: 100% !important; }
+        a[x-apple-data-detectors] { color: inherit !important; text-decoration: none !important; font-size: inherit !important; font-family: inherit !important; font-weight: inherit !important; line-height: inherit !important; }
+        /* Mobile styles */
+        @media screen and (max-width: 600px) {
+            .email-container { width: 100% !important; margin: auto !important; }
+            .stack-column, .stack-column-center { display: block !important; width: 100% !important; max-width: 100% !important; direction: ltr !important; }
+        }
+    </style>
+</head>
+<body style="margin: 0; padding: 0; background-color: #f4f4f4;">
+    <!-- Preview text (hidden but shown in email client preview) -->
+    <div style="display: none; font-size: 1px; line-height: 1px; max-height: 0px; max-width: 0px; opacity: 0; overflow: hidden; mso-hide: all;">
+        $preview
+    </div>
+    
+    <!-- Email wrapper -->
+    <table role="presentation" cellspacing="0" cellpadding="0" border="0" width="100%" style="background-color: #f4f4f4;">
+        <tr>
+            <td style="padding: 20px 0;">
+                <!-- Email container -->
+                <table class="email-container" role="presentation" cellspacing="0" cellpadding="0" border="0" width="600" style="margin: 0 auto; background-color: #ffffff;">
+                    <!-- Email body -->
+                    <tr>
+                        <td style="padding: 30px 40px;">
+                            $body
+                        </td>
+                    </tr>
+                    <!-- Footer -->
+                    <tr>
+                        <td style="padding: 20px 40px; background-color: #f8f8f8; border-top: 1px solid #e0e0e0;">
+                            <p style="margin: 0; font-family: Arial, sans-serif; font-size: 12px; color: #888888; text-align: center;">
+                                You received this email because you subscribed to our newsletter.<br>
+                                <a href="{{UNSUBSCRIBE_URL}}" style="color: #888888;">Unsubscribe</a> | <a href="{{PREFERENCES_URL}}" style="color: #888888;">Update preferences</a>
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>''')
+
+
 @dataclass(slots=True)
 class PackagingTools:
     """Filesystem helper used by the packaging executor."""
@@ -559,52 +1129,57 @@ class PackagingTools:
         video_dir = ensure_directory(base_dir / "video")
         strategy_dir = ensure_directory(base_dir / "strategy")
 
-        # Strategy assets
-        dump_json(package.strategy.model_dump(), strategy_dir / "strategy.json")
-        strategy_md = self._format_strategy_markdown(package.strategy)
-        (strategy_dir / "strategy.md").write_text(strategy_md, encoding="utf-8")
-
-        # Copywriting assets
-        (copy_dir / "hero_message.md").write_text(package.copywriting.hero_message, encoding="utf-8")
-        (copy_dir / "blog.md").write_text(package.copywriting.blog_article, encoding="utf-8")
-        dump_json([post.model_dump(exclude_none=True) for post in package.copywriting.social_posts], copy_dir / "social_posts.json")
-        dump_json(package.copywriting.blog_outline, copy_dir / "blog_outline.json")
-        dump_json(package.copywriting.pain_point_analysis, copy_dir / "pain_point_analysis.json")
-        dump_json(package.copywriting.cta_variations, copy_dir / "cta_variations.json")
+        # Every file is independent, so serialize here and write them all concurrently below
+        copywriting = package.copywriting
+        video = package.video
+        files: list[tuple[Path, str | bytes]] = [
+            # Strategy assets
+            (strategy_dir / "strategy.json", to_json_bytes(package.strategy.model_dump())),
+            (strategy_dir / "strategy.md", self._format_strategy_markdown(package.strategy)),
+            # Copywriting assets
+            (copy_dir / "hero_message.md", copywriting.hero_message),
+            (copy_dir / "blog.md", copywriting.blog_article),
+            (copy_dir / "social_posts.json", to_json_bytes([post.model_dump(exclude_none=True) for post in copywriting.social_posts])),
+            (copy_dir / "blog_outline.json", to_json_bytes(copywriting.blog_outline)),
+            (copy_dir / "pain_point_analysis.json", to_json_bytes(copywriting.pain_point_analysis)),
+            (copy_dir / "cta_variations.json", to_json_bytes(copywriting.cta_variations)),
+        ]
         
         # Email campaign assets
-        if package.copywriting.email_campaign:
+        if copywriting.email_campaign:
             email_dir = ensure_directory(copy_dir / "email")
-            email = package.copywriting.email_campaign
-            
-            # Save complete JSON data
-            dump_json(email.model_dump(exclude_none=True), email_dir / "email_campaign.json")
-            
-            # Save HTML email (ready for email clients)
-            html_email = self._format_email_html(email)
-            (email_dir / "email_campaign.html").write_text(html_email, encoding="utf-8")
-            
-            # Save plain text version
-            (email_dir / "email_campaign.txt").write_text(email.body_plain or "", encoding="utf-8")
-            
-            # Save subject lines for A/B testing
+            email = copywriting.email_campaign
+            files += [
+                # Complete JSON data
+                (email_dir / "email_campaign.json", to_json_bytes(email.model_dump(exclude_none=True))),
+                # HTML email (ready for email clients)
+                (email_dir / "email_campaign.html", self._format_email_html(email)),
+                # Plain text version
+                (email_dir / "email_campaign.txt", email.body_plain or ""),
+            ]
+            # Subject lines for A/B testing
             if email.subject_lines:
-                (email_dir / "subject_lines.txt").write_text("\n".join(email.subject_lines), encoding="utf-8")
+                files.append((email_dir / "subject_lines.txt", "\n".join(email.subject_lines)))
 
-        # Image assets
-        dump_json([prompt.model_dump(exclude_none=True) for prompt in package.images.prompts], img_dir / "prompts.json")
-        dump_json([asset.model_dump(exclude_none=True) for asset in package.images.assets], img_dir / "assets.json")
-
-        # Video assets
-        dump_json([scene.model_dump(exclude_none=True) for scene in package.video.scenes], video_dir / "scenes.json")
-        dump_json(package.video.model_dump(exclude_none=True), video_dir / "video_script.json")
-        (video_dir / "script.md").write_text(package.video.srt_caption, encoding="utf-8")
-        (video_dir / "cta.md").write_text(package.video.cta, encoding="utf-8")
-        if package.video.structure_notes:
-            (video_dir / "structure_notes.md").write_text("\n".join(f"- {note}" for note in package.video.structure_notes), encoding="utf-8")
+        files += [
+            # Image assets
+            (img_dir / "prompts.json", to_json_bytes([prompt.model_dump(exclude_none=True) for prompt in package.images.prompts])),
+            (img_dir / "assets.json", to_json_bytes([asset.model_dump(exclude_none=True) for asset in package.images.assets])),
+            # Video assets
+            (video_dir / "scenes.json", to_json_bytes([scene.model_dump(exclude_none=True) for scene in video.scenes])),
+            (video_dir / "video_script.json", to_json_bytes(video.model_dump(exclude_none=True))),
+            (video_dir / "script.md", video.srt_caption),
+            (video_dir / "cta.md", video.cta),
+        ]
+        if video.structure_notes:
+            files.append((video_dir / "structure_notes.md", "\n".join(f"- {note}" for note in video.structure_notes)))
 
         # Manifest
-        dump_json(package.model_dump(exclude_none=True), base_dir / "manifest.json")
+        files.append((base_dir / "manifest.json", to_json_bytes(package.model_dump(exclude_none=True))))
+
+        with ThreadPoolExecutor(max_workers=_PERSIST_WORKERS) as pool:
+            # list() surfaces the first write error, as the sequential writes did
+            list(pool.map(_write_file, files))
         return str(base_dir)
     
     def _format_strategy_markdown(self, strategy) -> str:
@@ -644,70 +1219,45 @@ class PackagingTools:
         subject = email.subject_lines[0] if email.subject_lines else "Marketing Email"
         preview = email.preview_text or ""
         
-        return f'''<!DOCTYPE html>
-<html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta http-equiv="X-UA-Compatible" content="IE=edge">
-    <meta name="x-apple-disable-message-reformatting">
-    <title>{subject}</title>
-    <!--[if mso]>
-    <noscript>
-        <xml>
-            <o:OfficeDocumentSettings>
-                <o:PixelsPerInch>96</o:PixelsPerInch>
-            </o:OfficeDocumentSettings>
-        </xml>
-    </noscript>
-    <![endif]-->
-    <style type="text/css">
-        /* Reset styles */
-        body, table, td, a {{ -webkit-text-size-adjust: 100%; -ms-text-size-adjust: 100%; }}
-        table, td {{ mso-table-lspace: 0pt; mso-table-rspace: 0pt; }}
-        img {{ -ms-interpolation-mode: bicubic; border: 0; height: auto; line-height: 100%; outline: none; text-decoration: none; }}
-        body {{ margin: 0 !important; padding: 0 !important; width: 100% !important; }}
-        a[x-apple-data-detectors] {{ color: inherit !important; text-decoration: none !important; font-size: inherit !important; font-family: inherit !important; font-weight: inherit !important; line-height: inherit !important; }}
-        /* Mobile styles */
-        @media screen and (max-width: 600px) {{
-            .email-container {{ width: 100% !important; margin: auto !important; }}
-            .stack-column, .stack-column-center {{ display: block !important; width: 100% !important; max-width: 100% !important; direction: ltr !important; }}
-        }}
-    </style>
-</head>
-<body style="margin: 0; padding: 0; background-color: #f4f4f4;">
-    <!-- Preview text (hidden but shown in email client preview) -->
-    <div style="display: none; font-size: 1px; line-height: 1px; max-height: 0px; max-width: 0px; opacity: 0; overflow: hidden; mso-hide: all;">
-        {preview}
-    </div>
-    
-    <!-- Email wrapper -->
-    <table role="presentation" cellspacing="0" cellpadding="0" border="0" width="100%" style="background-color: #f4f4f4;">
-        <tr>
-            <td style="padding: 20px 0;">
-                <!-- Email container -->
-                <table class="email-container" role="presentation" cellspacing="0" cellpadding="0" border="0" width="600" style="margin: 0 auto; background-color: #ffffff;">
-                    <!-- Email body -->
-                    <tr>
-                        <td style="padding: 30px 40px;">
-                            {email.body_html or ""}
-                        </td>
-                    </tr>
-                    <!-- Footer -->
-                    <tr>
-                        <td style="padding: 20px 40px; background-color: #f8f8f8; border-top: 1px solid #e0e0e0;">
-                            <p style="margin: 0; font-family: Arial, sans-serif; font-size: 12px; color: #888888; text-align: center;">
-                                You received this email because you subscribed to our newsletter.<br>
-                                <a href="{{{{UNSUBSCRIBE_URL}}}}" style="color: #888888;">Unsubscribe</a> | <a href="{{{{PREFERENCES_URL}}}}" style="color: #888888;">Update preferences</a>
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>'''
+        return _EMAIL_HTML_TEMPLATE.substitute(subject=subject, preview=preview, body=email.body_html or "")
+
+
+@dataclass(slots=True)
+class CampaignCache:
+    """On-disk cache of finished campaign packages keyed by the inputs that produced them."""
+
+    cache_dir: Path = Path("artifacts/campaigns/.cache")
+
+    @staticmethod
+    def make_key(inputs: Mapping[str, Any]) -> str:
+        """Hash the workflow inputs into a stable cache key."""
+        # Agent options may hold non-JSON values (e.g. response_format models); their str() stands in
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def load(self, key: str) -> Optional[CampaignPackage]:
+        """Return the cached package for ``key``, or None on a miss or unreadable entry."""
+        try:
+            return CampaignPackage.model_validate_json((self.cache_dir / f"{key}.json").read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, package: CampaignPackage) -> None:
+        """Atomically write ``package`` under ``key``.
+
+        Each write goes through its own temp file, so concurrent runs storing the
+        same key never clobber each other's partial output.
+        """
+        ensure_directory(self.cache_dir)
+        path = self.cache_dir / f"{key}.json"
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp", delete=False) as handle:
+            tmp_path = Path(handle.name)
+        try:
+            tmp_path.write_text(package.model_dump_json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
 
 async def maybe_await(value: Any) -> Any:
@@ -4,44 +4,93 @@ from __future__ import annotations
 
 import json
 import re
-from datetime import datetime
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
-_JSON_BLOCK_RE = re.compile(r"```(?:json)?(.*?)```", re.DOTALL | re.IGNORECASE)
-_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+", re.IGNORECASE)
+try:  # Optional fast JSON encoder; stdlib json is used when it is not installed
+    import orjson
+except ImportError:  # pragma: no cover - orjson not installed
+    orjson = None
 
+_FENCE = "```"
+# Applied to lowercased text, so no IGNORECASE (which would also let e.g. "ſ" match [a-z])
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_JSON_DECODER = json.JSONDecoder()
+# Accepts raw control characters inside strings, which decode to the same values the fix-ups would escape
+_LENIENT_JSON_DECODER = json.JSONDecoder(strict=False)
 
+
+@lru_cache(maxsize=1024)
 def slugify(value: str, *, max_length: int = 60) -> str:
     """Convert arbitrary text into a filesystem-friendly slug."""
 
-    value_ascii = value.strip().lower()
-    slug = _NON_ALNUM_RE.sub("-", value_ascii).strip("-")
+    # Surrounding whitespace becomes edge dashes, which strip("-") removes
+    slug = _NON_ALNUM_RE.sub("-", value.lower()).strip("-")
     if not slug:
         slug = "campaign"
     return slug[:max_length]
 
 
+def _strip_json_fence(payload: str) -> str:
+    """Return the agent text with surrounding whitespace and any ```json fence removed."""
+
+    if not payload:
+        raise ValueError("Empty payload cannot be parsed as JSON")
+
+    text = payload.strip()
+    # The first fence pair, with an optional (case-insensitive) json tag on the opening fence
+    opening = text.find(_FENCE)
+    if opening != -1:
+        closing = text.find(_FENCE, opening + 3)
+        if closing != -1:
+            inner = text[opening + 3 : closing]
+            if inner[:4].casefold() == "json":
+                inner = inner[4:]
+            text = inner.strip()
+    return text
+
+
+def _decode_bare_object(payload: str) -> Optional[tuple[str, dict[str, Any]]]:
+    """Return the stripped text and its object when the whole payload is one JSON object."""
+
+    # The common case for well-prompted agents; skips the fence regex and the brace scans
+    text = payload.strip() if payload else ""
+    if text[:1] != "{" or text[-1:] != "}":
+        return None
+    try:
+        return text, json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
 def extract_json_object(payload: str) -> str:
     """Best-effort extraction of a JSON object from agent text output.
     
-    This function attempts to extract and fix common JSON issues from LLM outputs,
-    including:
+    A payload that is just a JSON object is returned after one ``json.loads``;
+    other well-formed output is located with a single C-level ``raw_decode``
+    pass from the first ``{``. Otherwise this function attempts to extract and fix common
+    JSON issues from LLM outputs, including:
     - JSON wrapped in markdown code blocks
     - Trailing commas
     - Unescaped control characters
     - Invalid escape sequences
     """
 
-    if not payload:
-        raise ValueError("Empty payload cannot be parsed as JSON")
-
-    text = payload.strip()
-    fenced_match = _JSON_BLOCK_RE.search(text)
-    if fenced_match:
-        text = fenced_match.group(1).strip()
+    bare = _decode_bare_object(payload)
+    if bare is not None:
+        return bare[0]
 
+    text = _strip_json_fence(payload)
     start = text.find("{")
+    if start != -1:
+        try:
+            _, end = _JSON_DECODER.raw_decode(text, start)
+            return text[start:end]
+        except json.JSONDecodeError:
+            pass
+
     end = text.rfind("}")
     if start == -1 or end == -1 or end <= start:
         raise ValueError("Could not locate JSON object boundaries in agent output")
@@ -59,6 +108,111 @@ def extract_json_object(payload: str) -> str:
         raise ValueError(f"Failed to parse JSON after fixes: {e}")
 
 
+def parse_json_object(payload: str) -> dict[str, Any]:
+    """Like :func:`extract_json_object` but return the decoded object.
+
+    Well-formed output, including strings with raw newlines or tabs, is decoded
+    exactly once; only malformed output goes through the string fix-ups and a
+    second parse.
+    """
+
+    bare = _decode_bare_object(payload)
+    if bare is not None:
+        return bare[1]
+
+    text = _strip_json_fence(payload)
+    start = text.find("{")
+    if start != -1:
+        try:
+            return _LENIENT_JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pass
+    return json.loads(extract_json_object(payload))
+
+
+class JsonObjectScanner:
+    """Incrementally detect the first complete top-level JSON object in streamed text.
+
+    Feed text chunks as they arrive; ``feed`` returns the object text (from its
+    opening to its matching closing brace) as soon as the object is balanced, so
+    callers can stop waiting for the rest of the generation. Braces inside JSON
+    strings, including escaped quotes, are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume ``chunk`` and return the object text once it is complete."""
+
+        start = 0 if self._depth else None
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == "{":
+                if not self._depth:
+                    start = index
+                self._depth += 1
+            elif not self._depth:
+                # Prose or code fences before the object
+                continue
+            elif char == "}":
+                self._depth -= 1
+                if not self._depth:
+                    self._parts.append(chunk[start : index + 1])
+                    return "".join(self._parts)
+            elif char == '"':
+                self._in_string = True
+        if start is not None:
+            self._parts.append(chunk[start:])
+        return None
+
+
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+# A string literal (unterminated ones run to the end of the text), or a backslash pair outside
+# strings, which is skipped so that an escaped quote there does not open a string
+_JSON_STRING_RE = re.compile(r'\\.|"(?:[^"\\]+|\\.|\\\Z)*"?', re.DOTALL)
+# Valid JSON escapes are: \", \\, \/, \b, \f, \n, \r, \t, \uXXXX; any other backslash is captured
+_STRING_ESCAPE_RE = re.compile(r'\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})|(\\)')
+# Control characters that need to be escaped in JSON strings
+_CONTROL_CHAR_RE = re.compile(r'[\x00-\x1f]')
+_CONTROL_CHAR_ESCAPES = {
+    **{chr(code): f"\\u{code:04x}" for code in range(32)},
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+    "\b": "\\b",
+    "\f": "\\f",
+}
+
+
+def _fix_escape(match: re.Match[str]) -> str:
+    # Invalid escape - double the backslash to escape it
+    return "\\\\" if match.group(1) else match.group()
+
+
+def _escape_control_char(match: re.Match[str]) -> str:
+    return _CONTROL_CHAR_ESCAPES[match.group()]
+
+
+def _fix_string_literal(match: re.Match[str]) -> str:
+    """Escape stray backslashes, then raw control characters, in one string literal."""
+    literal = match.group()
+    if literal[0] != '"':
+        return literal
+    if "\\" in literal:
+        literal = _STRING_ESCAPE_RE.sub(_fix_escape, literal)
+    return _CONTROL_CHAR_RE.sub(_escape_control_char, literal)
+
+
 def _fix_json_string(json_str: str) -> str:
     """Fix common JSON issues in LLM outputs.
     
@@ -75,84 +229,15 @@ def _fix_json_string(json_str: str) -> str:
         pass
     
     # Step 2: Remove trailing commas before ] or }
-    fixed = re.sub(r',(\s*[}\]])', r'\1', json_str)
+    fixed = _TRAILING_COMMA_RE.sub(r'\1', json_str)
     try:
         json.loads(fixed)
         return fixed
     except json.JSONDecodeError:
         pass
     
-    # Step 3: Fix control characters and invalid escape sequences character by character
-    # Valid JSON escapes are: \", \\, \/, \b, \f, \n, \r, \t, \uXXXX
-    VALID_ESCAPE_CHARS = set('"\\bfnrt/')
-    # Control characters that need to be escaped in JSON strings
-    CONTROL_CHAR_MAP = {
-        '\n': '\\n',
-        '\r': '\\r', 
-        '\t': '\\t',
-        '\b': '\\b',
-        '\f': '\\f',
-    }
-    
-    result = []
-    i = 0
-    in_string = False
-    
-    while i < len(fixed):
-        char = fixed[i]
-        
-        if char == '"':
-            # Check if this quote is escaped by counting preceding backslashes
-            num_backslashes = 0
-            j = len(result) - 1
-            while j >= 0 and result[j] == '\\':
-                num_backslashes += 1
-                j -= 1
-            if num_backslashes % 2 == 0:
-                in_string = not in_string
-            result.append(char)
-            i += 1
-        elif in_string and char in CONTROL_CHAR_MAP:
-            # Real control character inside a string - escape it
-            result.append(CONTROL_CHAR_MAP[char])
-            i += 1
-        elif in_string and ord(char) < 32:
-            # Other control characters - use unicode escape
-            result.append(f'\\u{ord(char):04x}')
-            i += 1
-        elif char == '\\' and in_string:
-            # We're inside a string and found a backslash
-            if i + 1 < len(fixed):
-                next_char = fixed[i + 1]
-                if next_char == 'u':
-                    # Could be \uXXXX - check if valid hex
-                    if i + 5 < len(fixed) and all(c in '0123456789abcdefABCDEF' for c in fixed[i+2:i+6]):
-                        # Valid unicode escape
-                        result.append(fixed[i:i+6])
-                        i += 6
-                    else:
-                        # Invalid \u sequence - escape the backslash
-                        result.append('\\\\')
-                        i += 1
-                elif next_char in VALID_ESCAPE_CHARS:
-                    # Valid escape sequence
-                    result.append(char)
-                    result.append(next_char)
-                    i += 2
-                else:
-                    # Invalid escape - double the backslash to escape it
-                    result.append('\\\\')
-                    i += 1
-            else:
-                # Backslash at end of string - escape it
-                result.append('\\\\')
-                i += 1
-        else:
-            # Regular character or backslash outside string
-            result.append(char)
-            i += 1
-    
-    fixed = ''.join(result)
+    # Step 3: Fix invalid escape sequences and control characters inside string literals
+    fixed = _JSON_STRING_RE.sub(_fix_string_literal, fixed)
     
     try:
         json.loads(fixed)
@@ -172,6 +257,22 @@ def _fix_json_string(json_str: str) -> str:
     return fixed
 
 
+def format_json(data: Any) -> str:
+    """Pretty-print JSON-compatible data (2-space indent, non-ASCII kept as-is)."""
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def compact_json(data: Any) -> str:
+    """Serialize JSON-compatible data without whitespace, for embedding in prompts."""
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
 def ensure_directory(path: str | Path) -> Path:
     """Create the directory if necessary and return it as a Path."""
 
@@ -180,13 +281,49 @@ def ensure_directory(path: str | Path) -> Path:
     return p
 
 
+def to_json_bytes(data: Any) -> bytes:
+    """Serialize data the way :func:`dump_json` writes it: UTF-8, 2-space indent, other types via str."""
+
+    if orjson is not None:
+        # Datetimes pass through to str() so timestamps keep the stdlib formatting
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+
 def dump_json(data: Any, path: Path) -> None:
     """Write JSON to disk with UTF-8 encoding."""
 
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    if orjson is not None:
+        path.write_bytes(to_json_bytes(data))
+        return
+    # The stdlib encoder streams its chunks into the file, so the whole document is never held in memory
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, ensure_ascii=False, default=str)
+
+
+# Chat client attributes that select the provider model; any that are set form part of the identity
+_CLIENT_IDENTITY_ATTRS = ("model_id", "ai_model_id", "deployment_name", "endpoint", "base_url")
+
+
+def client_identity(chat_client: Any) -> dict[str, str]:
+    """Describe a chat client's class and model, for cache keys that must not be shared across models."""
+
+    client_type = type(chat_client)
+    identity = {"class": f"{client_type.__module__}.{client_type.__qualname__}"}
+    for attr in _CLIENT_IDENTITY_ATTRS:
+        value = getattr(chat_client, attr, None)
+        if value:
+            identity[attr] = str(value)
+    return identity
 
 
 def timestamp_id() -> str:
     """Return a compact UTC timestamp for folder naming."""
 
-    return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    # gmtime fields are formatted directly; no datetime object or strftime format parsing
+    t = time.gmtime()
+    return "%04d%02d%02d_%02d%02d%02d" % (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)
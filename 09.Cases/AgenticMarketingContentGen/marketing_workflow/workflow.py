@@ -1,14 +1,18 @@
 """High level orchestration for the agentic marketing workflow."""
 
 import asyncio
+import json
 import sys
+import time
 from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, List, Mapping, Optional, Union
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
 
 from agent_framework import (
+    AgentRunResponseUpdate,
     AgentRunUpdateEvent,
+    ChatAgent,
     ChatClientProtocol,
     ChatMessage,
     CheckpointStorage,
@@ -17,6 +21,7 @@ from agent_framework import (
     InMemoryCheckpointStorage,
     Role,
     SequentialBuilder,
+    TextContent,
     Workflow,
     WorkflowOutputEvent,
     WorkflowContext,
@@ -26,12 +31,49 @@ from agent_framework import (
     handler,
 )
 from agent_framework._workflows._events import ExecutorInvokedEvent, ExecutorCompletedEvent
+from pydantic import BaseModel
 
-from .agents import MarketingAgents, create_marketing_agents
+from .agents import PARALLEL_STAGE_GROUPS, MarketingAgents, create_marketing_agents, select_instructions
 from .research import DeepResearchExecutor
 from .schemas import CampaignPackage, CopywritingContent, ImageContent, MarketingStrategy, VideoScript
-from .tools import FluxImageGenerationTools, ImageGenerationTools, PackagingTools, SoraVideoGenerationTools, TavilySearchTools
-from .utils import extract_json_object, slugify, timestamp_id
+from .tools import CampaignCache, FluxImageGenerationTools, ImageGenerationTools, PackagingTools, SoraVideoGenerationTools, TavilySearchTools
+from .utils import client_identity, format_json, parse_json_object, slugify, timestamp_id
+
+# Event and content classes the stream loop reacts to; none subclasses another
+_STREAM_EVENT_TYPES = (
+    ExecutorInvokedEvent,
+    AgentRunUpdateEvent,
+    ExecutorCompletedEvent,
+    WorkflowStatusEvent,
+    WorkflowOutputEvent,
+)
+_TOOL_CONTENT_TYPES = (FunctionCallContent, FunctionResultContent)
+
+
+# Debug output shows 200 characters of tool arguments at most, so larger payloads are not parsed
+_TOOL_ARGS_PARSE_LIMIT = 4096
+
+
+def _clock_time() -> str:
+    """Local wall-clock time for debug output, formatted at most once per second."""
+    return _format_clock(int(time.time()))
+
+
+@lru_cache(maxsize=1)
+def _format_clock(second: int) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(second))
+
+
+@lru_cache(maxsize=None)
+def _event_kind(event_type: type) -> Optional[type]:
+    """Map a streamed event's class to the handled class it derives from, or None."""
+    return next((kind for kind in _STREAM_EVENT_TYPES if issubclass(event_type, kind)), None)
+
+
+@lru_cache(maxsize=None)
+def _content_kind(content_type: type) -> Optional[type]:
+    """Map an update content's class to the tool call/result class it derives from, or None."""
+    return next((kind for kind in _TOOL_CONTENT_TYPES if issubclass(content_type, kind)), None)
 
 
 @dataclass(slots=True)
@@ -39,14 +81,20 @@ class MarketingWorkflowConfig:
     """Runtime configuration knobs for the workflow."""
 
     persist_output: bool = True
+    use_response_cache: bool = True
     output_dir: str = "artifacts/campaigns"
     enable_image_generation: bool = False
     enable_video_generation: bool = False
     enable_deep_research: bool = False
+    research_max_concurrency: int = 8
+    research_fuse_planning: bool = False
+    research_prefetch_searches: bool = True
+    enable_parallel_stages: bool = False
     debug: bool = False
     checkpoint_storage: Optional[CheckpointStorage] = None
     default_agent_options: Optional[Mapping[str, Any]] = None
     per_agent_options: Optional[Mapping[str, Mapping[str, Any]]] = None
+    prompt_cache_key: Optional[str] = None
 
 
 class AgenticMarketingWorkflow:
@@ -93,7 +141,11 @@ class AgenticMarketingWorkflow:
             self._deep_research_executor = DeepResearchExecutor(
                 chat_client=chat_client,
                 search_tool=self._tavily_tools.search,
+                search_many_tool=self._tavily_tools.search_many,
                 debug=self._config.debug,
+                max_concurrency=self._config.research_max_concurrency,
+                fuse_planning=self._config.research_fuse_planning,
+                search_fn=self._tavily_tools.run_search if self._config.research_prefetch_searches else None,
             )
         
         # Register web search tool for strategy and copywriting agents
@@ -101,7 +153,7 @@ class AgenticMarketingWorkflow:
         tool_registry["copywriting_agent"] = [self._tavily_tools.search]
         
         if self._flux_image_tools is not None:
-            tool_registry["image_agent"] = [self._flux_image_tools.generate_image]
+            tool_registry["image_agent"] = [self._flux_image_tools.generate_images, self._flux_image_tools.generate_image]
         elif self._image_tools is not None:
             tool_registry["image_agent"] = [self._image_tools.generate_image]
         
@@ -114,20 +166,48 @@ class AgenticMarketingWorkflow:
             tool_registry=tool_registry,
             default_agent_options=self._config.default_agent_options,
             per_agent_options=self._config.per_agent_options,
+            prompt_cache_key=self._config.prompt_cache_key,
         )
 
         self._tool_registry = tool_registry
+        self._agent_names: dict[str, str] = {
+            "strategy": self._agents.strategy.name or "strategy_agent",
+            "copywriting": self._agents.copywriting.name or "copywriting_agent",
+            "image": self._agents.image.name or "image_agent",
+            "video": self._agents.video.name or "video_agent",
+        }
+
+        # Cache finished campaigns keyed by everything that shapes the output except the topic;
+        # the cache lives under output_dir, so it is off whenever nothing is written to disk
+        self._campaign_cache: Optional[CampaignCache] = None
+        self._cache_inputs: dict[str, Any] = {}
+        if self._config.use_response_cache and self._config.persist_output:
+            self._campaign_cache = CampaignCache(Path(self._config.output_dir) / ".cache")
+            self._cache_inputs = {
+                "client": client_identity(chat_client),
+                "default_agent_options": self._config.default_agent_options,
+                "per_agent_options": self._config.per_agent_options,
+                "instructions": select_instructions(tool_registry),
+                "deep_research": self._config.enable_deep_research,
+                "fuse_planning": self._config.research_fuse_planning,
+                "prefetch_searches": self._config.research_prefetch_searches,
+                "parallel_stages": self._config.enable_parallel_stages,
+            }
+
         self._packaging_executor: Optional[_PackagingExecutor] = None
+        self._workflow: Optional[Workflow] = None
+        # Runs started within the same second get a sequence suffix so they never share a folder
+        self._last_campaign_stamp = ""
+        self._campaign_stamp_seq = 0
 
     def _create_workflow(self, campaign_dir: str) -> Workflow:
-        """Create a workflow with the given campaign directory."""
+        """Create a workflow with the given campaign directory.
+
+        Built per run so executor conversation state and default in-memory
+        checkpoints never carry over from one campaign into the next.
+        """
         packaging_executor = _PackagingExecutor(
-            agent_names={
-                "strategy": self._agents.strategy.name or "strategy_agent",
-                "copywriting": self._agents.copywriting.name or "copywriting_agent",
-                "image": self._agents.image.name or "image_agent",
-                "video": self._agents.video.name or "video_agent",
-            },
+            agent_names=self._agent_names,
             packaging_tools=self._packaging_tools if self._config.persist_output else None,
             campaign_dir=campaign_dir,
         )
@@ -141,28 +221,89 @@ class AgenticMarketingWorkflow:
         else:
             strategy_participant = self._agents.strategy
         
-        builder = SequentialBuilder().participants(
-            [
+        if self._config.enable_parallel_stages:
+            # Independent stages share one step and run concurrently
+            participants: list[Any] = []
+            for group in PARALLEL_STAGE_GROUPS:
+                if group == ("strategy",):
+                    participants.append(strategy_participant)
+                elif len(group) == 1:
+                    participants.append(getattr(self._agents, group[0]))
+                else:
+                    participants.append(
+                        _ConcurrentAgentsExecutor(
+                            [getattr(self._agents, stage) for stage in group],
+                            id=f"{'-'.join(group)}-executor",
+                        )
+                    )
+        else:
+            participants = [
                 strategy_participant,
                 self._agents.copywriting,
                 self._agents.image,
                 self._agents.video,
-                packaging_executor,
             ]
-        )
+
+        builder = SequentialBuilder().participants([*participants, packaging_executor])
 
         checkpoint_storage = self._config.checkpoint_storage or InMemoryCheckpointStorage()
-        return builder.with_checkpointing(checkpoint_storage).build()
+        self._workflow = builder.with_checkpointing(checkpoint_storage).build()
+        return self._workflow
+
+    def _next_campaign_folder(self) -> str:
+        """Return a timestamped campaign folder name that is unique for this instance."""
+        stamp = timestamp_id()
+        if stamp != self._last_campaign_stamp:
+            self._last_campaign_stamp = stamp
+            self._campaign_stamp_seq = 0
+            return f"{stamp}_campaign"
+        self._campaign_stamp_seq += 1
+        return f"{stamp}_{self._campaign_stamp_seq}_campaign"
 
     @property
     def workflow(self) -> Optional[Workflow]:
-        return getattr(self, '_workflow', None)
+        return self._workflow
 
     async def run(self, topic: str) -> CampaignPackage:
         """Execute the workflow end-to-end and return the packaged result."""
 
+        final_package: Optional[CampaignPackage] = None
+        async for result in self._run_stream(topic, yield_stages=False):
+            final_package = result
+        # package_path is already set by _PackagingExecutor
+        return final_package
+
+    async def stream(self, topic: str) -> AsyncIterator[BaseModel]:
+        """Execute the workflow, yielding each stage's structured output as soon as it completes.
+
+        Yields ``MarketingStrategy``, ``CopywritingContent``, ``ImageContent`` and
+        ``VideoScript`` as their agents finish (stages whose output cannot be parsed
+        are skipped), followed by the final ``CampaignPackage``.
+        """
+
+        async for result in self._run_stream(topic, yield_stages=True):
+            yield result
+
+    async def _run_stream(self, topic: str, *, yield_stages: bool) -> AsyncIterator[BaseModel]:
+        """Drive the workflow event stream shared by ``run`` and ``stream``."""
+
+        cache_key: Optional[str] = None
+        if self._campaign_cache is not None:
+            cache_key = self._campaign_cache.make_key({**self._cache_inputs, "topic": topic})
+            cached_package = self._campaign_cache.load(cache_key)
+            if cached_package is not None:
+                if self._config.debug:
+                    self._debug_print(f"♻️  Using cached campaign: {cached_package.package_path or cache_key}")
+                if yield_stages:
+                    yield cached_package.strategy
+                    yield cached_package.copywriting
+                    yield cached_package.images
+                    yield cached_package.video
+                yield cached_package
+                return
+
         # Generate campaign directory path with timestamp
-        campaign_folder = f"{timestamp_id()}_campaign"
+        campaign_folder = self._next_campaign_folder()
         campaign_dir = str(Path(self._config.output_dir) / campaign_folder)
         
         # Set image output directory to campaign's images subfolder
@@ -186,27 +327,41 @@ class AgenticMarketingWorkflow:
 
         final_package: Optional[CampaignPackage] = None
         current_executor: Optional[str] = None
-        streaming_text: str = ""
+        has_streamed_text = False  # Whether the current executor printed streamed tokens
         pending_tool_call: Optional[dict] = None  # Track tool call being streamed
+        stage_models = self._stage_models() if yield_stages else {}
+        stage_text: dict[str, list[str]] = {executor_id: [] for executor_id in stage_models}
+        # Without debug output or stage models only the final output event matters
+        observe_events = debug or bool(stage_models)
         
         async for event in workflow.run_stream(topic):
+            # Resolve the event class once per type instead of walking an isinstance chain per event
+            kind = _event_kind(type(event))
+            # Capture final output
+            if kind is WorkflowOutputEvent:
+                if isinstance(event.data, CampaignPackage):
+                    final_package = event.data
+                continue
+            if kind is None or not observe_events:
+                continue
             if debug:
                 # Handle executor invocation events
-                if isinstance(event, ExecutorInvokedEvent):
+                if kind is ExecutorInvokedEvent:
                     current_executor = event.executor_id
-                    streaming_text = ""
+                    has_streamed_text = False
                     pending_tool_call = None
                     self._debug_print(f"\n{'─'*50}")
                     self._debug_print(f"▶️  Executor Started: {current_executor}")
-                    self._debug_print(f"   Time: {datetime.now().strftime('%H:%M:%S')}")
+                    self._debug_print(f"   Time: {_clock_time()}")
                     
                 # Handle streaming text updates from agents
-                elif isinstance(event, AgentRunUpdateEvent):
+                elif kind is AgentRunUpdateEvent:
                     if event.data:
                         # Check for tool calls in contents
                         if hasattr(event.data, 'contents') and event.data.contents:
                             for content in event.data.contents:
-                                if isinstance(content, FunctionCallContent):
+                                content_kind = _content_kind(type(content))
+                                if content_kind is FunctionCallContent:
                                     # Only print if we have a complete function name
                                     if content.name:
                                         # Print previous pending tool call if exists
@@ -222,7 +377,7 @@ class AgenticMarketingWorkflow:
                                         # Append arguments to pending call
                                         pending_tool_call['arguments'] += str(content.arguments)
                                         
-                                elif isinstance(content, FunctionResultContent):
+                                elif content_kind is FunctionResultContent:
                                     # Print any pending tool call first
                                     if pending_tool_call and pending_tool_call.get('name'):
                                         self._print_tool_call(pending_tool_call)
@@ -238,41 +393,82 @@ class AgenticMarketingWorkflow:
                         # Handle streaming text
                         text_delta = event.data.text if hasattr(event.data, 'text') else ""
                         if text_delta:
-                            streaming_text += text_delta
+                            has_streamed_text = True
                             # Print streaming token to stderr for real-time feedback
                             print(text_delta, end="", flush=True, file=sys.stderr)
                 
                 # Handle executor completion events
-                elif isinstance(event, ExecutorCompletedEvent):
+                elif kind is ExecutorCompletedEvent:
                     # Print any pending tool call
                     if pending_tool_call and pending_tool_call.get('name'):
                         self._print_tool_call(pending_tool_call)
                         pending_tool_call = None
-                    if streaming_text:
+                    if has_streamed_text:
                         print(file=sys.stderr)  # New line after streaming
                     self._debug_print(f"✅ Executor Completed: {event.executor_id}")
-                    self._debug_print(f"   Time: {datetime.now().strftime('%H:%M:%S')}")
+                    self._debug_print(f"   Time: {_clock_time()}")
                     
                     # Show output location for packaging executor
                     if event.executor_id == "packaging-executor" and campaign_dir:
                         self._debug_print(f"   📦 Output: {campaign_dir}")
                 
                 # Handle workflow status changes
-                elif isinstance(event, WorkflowStatusEvent):
+                elif kind is WorkflowStatusEvent:
                     if event.state == WorkflowRunState.IDLE:
                         self._debug_print(f"\n{'='*60}")
                         self._debug_print(f"🏁 Workflow Completed")
                         self._debug_print(f"{'='*60}\n")
             
-            # Capture final output
-            if isinstance(event, WorkflowOutputEvent) and isinstance(event.data, CampaignPackage):
-                final_package = event.data
+            # Collect streamed text per stage and emit the parsed models once their executor completes
+            if stage_models:
+                if kind is AgentRunUpdateEvent and event.executor_id in stage_text:
+                    if event.data is not None and event.data.text:
+                        stage_text[event.executor_id].append(event.data.text)
+                elif kind is ExecutorCompletedEvent:
+                    for executor_id, chunks in stage_text.items():
+                        if not chunks:
+                            continue
+                        stage_result = await asyncio.to_thread(
+                            self._parse_stage, "".join(chunks), stage_models[executor_id]
+                        )
+                        chunks.clear()
+                        if stage_result is not None:
+                            yield stage_result
 
         if final_package is None:
             raise RuntimeError("Workflow finished without emitting a CampaignPackage payload.")
 
-        # package_path is already set by _PackagingExecutor
-        return final_package
+        if self._campaign_cache is not None and cache_key is not None:
+            # The cache is optional; a full disk or read-only directory must not fail a finished run
+            try:
+                self._campaign_cache.store(cache_key, final_package)
+            except OSError as e:
+                if debug:
+                    self._debug_print(f"⚠️ Could not cache campaign: {e}")
+
+        yield final_package
+
+    def _stage_models(self) -> dict[str, type[BaseModel]]:
+        """Map executor IDs of the content stages to the model they emit."""
+        if self._deep_research_executor is not None:
+            strategy_id = self._deep_research_executor.id
+        else:
+            strategy_id = self._agents.strategy.name or "strategy_agent"
+        return {
+            strategy_id: MarketingStrategy,
+            self._agents.copywriting.name or "copywriting_agent": CopywritingContent,
+            self._agents.image.name or "image_agent": ImageContent,
+            self._agents.video.name or "video_agent": VideoScript,
+        }
+
+    def _parse_stage(self, text: str, model_cls: type[BaseModel]) -> Optional[BaseModel]:
+        """Parse streamed stage output, returning None if it is not valid JSON for the model."""
+        try:
+            return model_cls.model_validate(parse_json_object(text))
+        except Exception as e:
+            if self._config.debug:
+                self._debug_print(f"⚠️ Could not parse streamed {model_cls.__name__}: {e}")
+            return None
     
     def _debug_print(self, message: str) -> None:
         """Print debug message to stderr."""
@@ -284,16 +480,18 @@ class AgenticMarketingWorkflow:
         args = tool_call.get('arguments', '')
         
         self._debug_print(f"\n   🔧 Tool Call: {name}")
+        if isinstance(args, str) and len(args) > _TOOL_ARGS_PARSE_LIMIT:
+            self._debug_print(f"      Arguments: {args[:200]}...")
+            return
         if args:
             # Try to format JSON arguments nicely
             try:
-                import json
                 args_dict = json.loads(args) if isinstance(args, str) else args
                 # Truncate long values
                 for key, value in args_dict.items():
                     if isinstance(value, str) and len(value) > 100:
                         args_dict[key] = value[:100] + "..."
-                args_str = json.dumps(args_dict, ensure_ascii=False, indent=2)
+                args_str = format_json(args_dict)
                 for line in args_str.split('\n'):
                     self._debug_print(f"      {line}")
             except:
@@ -307,6 +505,64 @@ class AgenticMarketingWorkflow:
 
         return asyncio.run(self.run(topic))
 
+    async def run_many(self, topics: Sequence[str], *, max_concurrency: int = 4) -> list[CampaignPackage]:
+        """Run several topics on one event loop and return their packages in input order.
+
+        The runs share the chat client and its connection pool. Image and video
+        tools write into a per-instance output directory, so runs are serialized
+        when either is enabled.
+        """
+
+        if self._flux_image_tools is not None or self._sora_video_tools is not None:
+            max_concurrency = 1
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(topic: str) -> CampaignPackage:
+            async with semaphore:
+                return await self.run(topic)
+
+        return list(await asyncio.gather(*(run_one(topic) for topic in topics)))
+
+    def run_many_sync(self, topics: Sequence[str], *, max_concurrency: int = 4) -> list[CampaignPackage]:
+        """Convenience synchronous wrapper around ``run_many``."""
+
+        return asyncio.run(self.run_many(topics, max_concurrency=max_concurrency))
+
+
+class _ConcurrentAgentsExecutor(Executor):
+    """Executor that runs independent agents concurrently on the same conversation."""
+
+    def __init__(self, agents: Sequence[ChatAgent], *, id: str) -> None:
+        super().__init__(id=id)
+        self._agents = list(agents)
+
+    @handler
+    async def handle(
+        self,
+        conversation: list[ChatMessage],
+        ctx: WorkflowContext,
+    ) -> None:
+        responses = await asyncio.gather(*(agent.run(conversation) for agent in self._agents))
+
+        updated_conversation = list(conversation)
+        for agent, response in zip(self._agents, responses):
+            text = response.text or ""
+            # Surface each agent's output like a streaming agent so run_stream consumers can observe it
+            await ctx.add_event(
+                AgentRunUpdateEvent(
+                    agent.name,
+                    AgentRunResponseUpdate(
+                        contents=[TextContent(text=text)],
+                        role=Role.ASSISTANT,
+                        author_name=agent.name,
+                    ),
+                )
+            )
+            updated_conversation.append(
+                ChatMessage(role=Role.ASSISTANT, author_name=agent.name, text=text)
+            )
+        await ctx.send_message(updated_conversation)
+
 
 class _PackagingExecutor(Executor):
     """Final executor that assembles structured outputs into a CampaignPackage."""
@@ -330,7 +586,8 @@ class _PackagingExecutor(Executor):
         conversation: list[ChatMessage],
         ctx: WorkflowContext,
     ) -> None:
-        package = self._build_package(conversation)
+        # Parsing and validating every stage payload is CPU-bound; keep it off the event loop
+        package = await asyncio.to_thread(self._build_package, conversation)
         if self._packaging_tools is not None and self._campaign_dir:
             package = package.with_package_path(
                 self._packaging_tools.persist_package(package, campaign_dir=self._campaign_dir)
@@ -341,17 +598,17 @@ class _PackagingExecutor(Executor):
             author_name=self._author,
             text=package.model_dump_json(indent=2, ensure_ascii=False),
         )
-        updated_conversation = list(conversation)
-        updated_conversation.append(summary)
-        await ctx.send_message(updated_conversation)
+        await ctx.send_message([*conversation, summary])
         await ctx.yield_output(package)
 
     def _build_package(self, conversation: list[ChatMessage]) -> CampaignPackage:
         topic = self._extract_topic(conversation)
-        strategy = self._extract_model(conversation, self._agent_names["strategy"], MarketingStrategy)
-        copywriting = self._extract_model(conversation, self._agent_names["copywriting"], CopywritingContent)
-        images = self._extract_model(conversation, self._agent_names["image"], ImageContent, allow_empty=True)
-        video = self._extract_model(conversation, self._agent_names["video"], VideoScript, allow_empty=True)
+        # One pass over the conversation instead of a reverse scan per stage
+        latest = self._latest_by_author(conversation)
+        strategy = self._extract_model(latest, self._agent_names["strategy"], MarketingStrategy)
+        copywriting = self._extract_model(latest, self._agent_names["copywriting"], CopywritingContent)
+        images = self._extract_model(latest, self._agent_names["image"], ImageContent, allow_empty=True)
+        video = self._extract_model(latest, self._agent_names["video"], VideoScript, allow_empty=True)
 
         campaign_id = slugify(f"{topic}-{strategy.target_audience}")
         return CampaignPackage(
@@ -370,11 +627,20 @@ class _PackagingExecutor(Executor):
                 return message.text.strip()
         raise ValueError("User topic not found in the conversation history.")
 
-    def _extract_model(self, conversation: list[ChatMessage], author_name: str, model_cls: type[Any], allow_empty: bool = False) -> Any:
+    @staticmethod
+    def _latest_by_author(conversation: list[ChatMessage]) -> dict[str, ChatMessage]:
+        """Map each assistant author name to its last message in the conversation."""
+        return {
+            message.author_name or "": message
+            for message in conversation
+            if message.role == Role.ASSISTANT
+        }
+
+    def _extract_model(self, latest: Mapping[str, ChatMessage], author_name: str, model_cls: type[Any], allow_empty: bool = False) -> Any:
         """Extract and parse a model from agent output.
         
         Args:
-            conversation: The conversation history
+            latest: Last assistant message per author, from _latest_by_author
             author_name: Name of the agent whose output to extract
             model_cls: Pydantic model class to parse into
             allow_empty: If True, return empty model on failure instead of raising
@@ -386,38 +652,37 @@ class _PackagingExecutor(Executor):
             ValueError: If parsing fails and allow_empty is False
         """
         try:
-            raw_text = self._extract_message_text(conversation, author_name)
-            payload = extract_json_object(raw_text)
-            return model_cls.model_validate_json(payload)
+            raw_text = self._extract_message_text(latest, author_name)
+            # Decode once and validate the dict, rather than locating the JSON and having pydantic re-parse it
+            return model_cls.model_validate(parse_json_object(raw_text))
         except Exception as e:
             # Catch ALL exceptions (ValueError, ValidationError, JSONDecodeError, etc.)
             if allow_empty:
-                import sys
                 print(f"[WARNING] Failed to parse {model_cls.__name__} from {author_name}: {e}", file=sys.stderr)
                 print(f"[WARNING] Using empty {model_cls.__name__}", file=sys.stderr)
                 return model_cls()
             # Re-raise with more context
             raise ValueError(f"Failed to parse {model_cls.__name__} from {author_name}: {e}") from e
 
-    def _extract_message_text(self, conversation: list[ChatMessage], author_name: str) -> str:
-        for message in reversed(conversation):
-            if message.role == Role.ASSISTANT and (message.author_name or "") == author_name:
-                # Try to get text content
-                text = message.text
-                if text:
-                    return text
-                
-                # If text is empty, try to extract from contents
-                if message.contents:
-                    from agent_framework import TextContent
-                    for content in message.contents:
-                        if isinstance(content, TextContent) and content.text:
-                            return content.text
-                        # Also check for dict-style content
-                        if isinstance(content, dict) and content.get("type") == "text":
-                            text_val = content.get("text", "")
-                            if text_val:
-                                return text_val
-                
-                raise ValueError(f"Message from {author_name} is empty")
-        raise ValueError(f"Missing assistant output from {author_name}")
+    def _extract_message_text(self, latest: Mapping[str, ChatMessage], author_name: str) -> str:
+        message = latest.get(author_name)
+        if message is None:
+            raise ValueError(f"Missing assistant output from {author_name}")
+
+        # Try to get text content
+        text = message.text
+        if text:
+            return text
+        
+        # If text is empty, try to extract from contents
+        if message.contents:
+            for content in message.contents:
+                if isinstance(content, TextContent) and content.text:
+                    return content.text
+                # Also check for dict-style content
+                if isinstance(content, dict) and content.get("type") == "text":
+                    text_val = content.get("text", "")
+                    if text_val:
+                        return text_val
+        
+        raise ValueError(f"Message from {author_name} is empty")